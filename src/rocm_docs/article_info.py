@@ -7,213 +7,320 @@ https://rocm.docs.amd.com/projects/rocm-docs-core/en/latest/user_guide/article_i
 from typing import Any, cast
 
 import importlib.resources
-import os
 import re
+from collections.abc import Set
 from pathlib import Path
 
-import bs4
 import git.repo
+from docutils import nodes
 from sphinx.application import Sphinx
-from sphinx.config import Config
+from sphinx.environment import BuildEnvironment
+from sphinx.environment.collectors import EnvironmentCollector
 
+from rocm_docs import git_index, output
 
-def set_article_info(app: Sphinx, _: Config) -> None:
-    """Add article info headers to HTML pages."""
-    if (
-        app.config.setting_all_article_info is False
-        and len(app.config.article_pages) == 0
-    ):
-        return
-
-    article_info = (
-        importlib.resources.files("rocm_docs")
-        .joinpath("rocm_docs_theme/components/article-info.html")
-        .read_text(encoding="utf-8")
-    )
-
-    specific_pages: list[str] = []
-
-    _set_page_article_info(app, article_info, specific_pages)
-
-    if app.config.setting_all_article_info is True:
-        _set_all_article_info(app, article_info, specific_pages)
+# End of the page title, after which the header is inserted.
+_TITLE_END = re.compile(r"</h1\s*>", re.IGNORECASE)
+# An article info header that is already placed after the title.
+_EXISTING_ARTICLE_INFO = re.compile(
+    r'\s*<div\s+id="rocm-docs-core-article-info"', re.IGNORECASE
+)
 
 
-def _set_page_article_info(
-    app: Sphinx, article_info: str, specific_pages: list[str]
-) -> None:
-    """Add article info headers to the configured HTML pages.
+class _ArticleInfoRenderer:
+    """Event handlers adding the article info header while pages are written.
 
-    The pages can be set in "article_pages" of the Sphinx configuration.
+    The header is inserted after the title in the rendered body of each page,
+    so it is part of the output of every HTML builder, including parallel
+    writes, and only pages that are written in a build are processed. The
+    git dates are looked up in the main process while the sources are read.
     """
-    repo = git.repo.Repo(app.srcdir, search_parent_directories=True)
-    for page in app.config.article_pages:
-        path_rel = app.project.doc2path(page["file"], False)
-        path_html = Path(app.outdir, path_rel).with_suffix(".html")
-        path_source = Path(app.srcdir, path_rel)
-
-        # FIXME: This will silently skip all files when not building the default
-        # `html` format (e.g `htmlzip`, `epub` or `pdf`)
-        if not path_html.is_file():
-            continue
-
-        os_list = []
-        page.setdefault("os", app.config.all_article_info_os)
-        if "linux" in page["os"]:
-            os_list.append("Linux")
-        if "windows" in page["os"]:
-            os_list.append("Windows")
-        article_os_info = " and ".join(os_list)
-        if os_list:
-            article_os_info = f"Applies to {article_os_info}"
-        modified_info = article_info.replace("<!--os-info-->", article_os_info)
-
-        author = app.config.all_article_info_author
-        if "author" in page:
-            author = page["author"]
-        modified_info = modified_info.replace("<!--author-info-->", author)
-
-        date_info: str | None = None
-        if "date" in page:
-            date_info = page["date"]
-        else:
-            date_info = _get_time_last_modified(repo, path_source)
 
-        if date_info == "":
-            soup = bs4.BeautifulSoup(modified_info, "html.parser")
-            svg_to_remove = soup.find("span", class_="article-info-date-svg")
-            if svg_to_remove and isinstance(svg_to_remove, bs4.Tag):
-                svg_to_remove.decompose()
-            modified_info = str(soup)
+    def __init__(self) -> None:
+        self.template = (
+            importlib.resources.files("rocm_docs")
+            .joinpath("rocm_docs_theme/components/article-info.html")
+            .read_text(encoding="utf-8")
+        )
+        # Git dates of the documents, by docname.
+        self.dates: dict[str, str] = {}
+        self.pages: dict[str, dict[str, Any]] = {}
+
+    @staticmethod
+    def _enabled(app: Sphinx) -> bool:
+        return (
+            app.config.setting_all_article_info is True
+            or len(app.config.article_pages) > 0
+        )
 
-        if date_info is not None:
-            modified_info = modified_info.replace("<!--date-info-->", date_info)
+    def env_get_outdated(
+        self,
+        app: Sphinx,
+        env: BuildEnvironment,
+        added: Set[str],
+        changed: Set[str],
+        removed: Set[str],
+    ) -> list[str]:
+        """Look up the git dates and return the pages whose date changed.
+
+        Pages are rewritten when their source changes, but a commit does not
+        always change the source (for example when committing a file that
+        was already built), so such pages are marked as outdated too.
+        """
+        self.pages = {page["file"]: page for page in app.config.article_pages}
+        self.dates = self._lookup_dates(app) if self._enabled(app) else {}
+
+        previous = getattr(env, "rocm_docs_article_info_dates", None)
+        env.rocm_docs_article_info_dates = self.dates  # type: ignore[attr-defined]
+        if previous is None:
+            return []
+        skip = added | changed | removed
+        return sorted(
+            docname
+            for docname in previous.keys() | self.dates.keys()
+            if docname not in skip
+            and docname in env.all_docs
+            and previous.get(docname) != self.dates.get(docname)
+        )
 
-        if "read-time" in page:
-            read_time = page["read-time"]
+    def _lookup_dates(self, app: Sphinx) -> dict[str, str]:
+        """Look up the git dates of all documents that need one.
+
+        The dates are cached in the doctree directory and updated
+        incrementally.
+        """
+        docnames = [
+            docname
+            for docname, page in self.pages.items()
+            if "date" not in page
+        ]
+        if app.config.setting_all_article_info is True:
+            docnames.extend(app.project.docnames)
+        if not docnames:
+            return {}
+        sources = {
+            docname: Path(app.srcdir, app.project.doc2path(docname, False))
+            for docname in docnames
+        }
+        repo = git.repo.Repo(app.srcdir, search_parent_directories=True)
+        dates = git_index.last_modified_dates(
+            repo,
+            sources.values(),
+            Path(app.doctreedir, git_index.CACHE_FILENAME),
+        )
+        return {
+            docname: dates[source]
+            for docname, source in sources.items()
+            if source in dates
+        }
+
+    def html_page_context(
+        self,
+        app: Sphinx,
+        pagename: str,
+        templatename: str,  # noqa: ARG002
+        context: dict[str, Any],
+        doctree: nodes.document | None,
+    ) -> None:
+        """Insert the article info header into the body of a document."""
+        if doctree is None or "body" not in context or not self._enabled(app):
+            return
+        article_info = self._page_article_info(app, pagename)
+        if article_info is None:
+            return
+        body = _insert_article_info(context["body"], article_info)
+        if body is not None:
+            context["body"] = body
+
+    def output_files(self, app: Sphinx) -> list[str]:
+        """Return the pages written with an article info header."""
+        if not self._enabled(app) or not hasattr(
+            app.builder, "get_outfilename"
+        ):
+            return []
+        if app.config.setting_all_article_info is True:
+            docnames = app.env.found_docs
         else:
-            read_time = _estimate_read_time(path_html)
+            docnames = app.env.found_docs & self.pages.keys()
+        outdir = Path(app.outdir)
+        return sorted(
+            Path(app.builder.get_outfilename(docname))
+            .relative_to(outdir)
+            .as_posix()
+            for docname in docnames
+        )
 
-        if read_time == "":
-            soup = bs4.BeautifulSoup(modified_info, "html.parser")
-            svg_to_remove = soup.find(
-                "span", class_="article-info-read-time-svg"
+    def _page_article_info(self, app: Sphinx, docname: str) -> str | None:
+        """Render the header of a page, or ``None`` if it has no header.
+
+        Settings of the page in "article_pages" override the general
+        settings, which apply to all pages if "setting_all_article_info" is
+        enabled.
+        """
+        page = self.pages.get(docname)
+        if page is not None:
+            page.setdefault("os", app.config.all_article_info_os)
+            return _render_article_info(
+                self.template,
+                os_info=_os_info(page["os"]),
+                author=page.get("author", app.config.all_article_info_author),
+                date_info=page.get("date", self.dates.get(docname)),
+                read_time=page.get(
+                    "read-time", _estimate_read_time(app.env, docname)
+                ),
             )
-            if svg_to_remove and isinstance(svg_to_remove, bs4.Tag):
-                svg_to_remove.decompose()
-            modified_info = str(soup)
-
-        if read_time is not None:
-            modified_info = modified_info.replace("<!--read-info-->", read_time)
 
-        specific_pages.append(page["file"])
-        _write_article_info(path_html, modified_info)
+        if app.config.setting_all_article_info is not True:
+            return None
+        date_info = self.dates.get(docname)
+        if not date_info:
+            date_info = cast(str, app.config.all_article_info_date)
+        return _render_article_info(
+            self.template,
+            os_info=_os_info(app.config.all_article_info_os),
+            author=app.config.all_article_info_author,
+            date_info=date_info,
+            read_time=_estimate_read_time(app.env, docname),
+        )
 
 
-def _set_all_article_info(
-    app: Sphinx, article_info: str, specific_pages: list[str]
-) -> None:
-    """Add article info headers with general settings to all HTML pages.
+def _insert_article_info(body: str, article_info: str) -> str | None:
+    """Insert the header after the first title of *body*.
 
-    Pages that have specific settings (configured by "article_pages") are
-    skipped.
+    Only the markup up to the end of the title is scanned, so the cost does
+    not depend on the size of the rest of the page. Returns ``None`` if the
+    body has no title or a header already follows it.
     """
-    repo = git.repo.Repo(app.srcdir, search_parent_directories=True)
-    for docname in app.project.docnames:
-        # skip pages with specific settings
-        if docname in specific_pages:
-            continue
-
-        page_rel = app.project.doc2path(docname, False)
-        page = Path(app.outdir, page_rel).with_suffix(".html")
-
-        # FIXME: This will silently skip all files when not building the default
-        # `html` format (e.g `htmlzip`, `epub` or `pdf`)
-        if not page.is_file():
-            continue
+    match = _TITLE_END.search(body)
+    if match is None:
+        return None
+    title_end = match.end()
+    if _EXISTING_ARTICLE_INFO.match(body, title_end):
+        return None
+    return "".join((body[:title_end], article_info, body[title_end:]))
+
+
+def _os_info(os_names: list[str]) -> str:
+    os_list = []
+    if "linux" in os_names:
+        os_list.append("Linux")
+    if "windows" in os_names:
+        os_list.append("Windows")
+    article_os_info = " and ".join(os_list)
+    if os_list:
+        article_os_info = f"Applies to {article_os_info}"
+    return article_os_info
+
+
+def _remove_svg_span(article_info: str, span_class: str) -> str:
+    """Remove the icon in the ``<span>`` with *span_class* from the header."""
+    return re.sub(
+        rf'<span class="[^"]*\b{span_class}\b[^"]*">.*?</span>',
+        "",
+        article_info,
+        count=1,
+        flags=re.DOTALL,
+    )
 
-        os_list = []
-        if "linux" in app.config.all_article_info_os:
-            os_list.append("Linux")
-        if "windows" in app.config.all_article_info_os:
-            os_list.append("Windows")
-        article_os_info = " and ".join(os_list)
-        if os_list:
-            article_os_info = f"Applies to {article_os_info}"
 
-        date_info = _get_time_last_modified(repo, Path(app.srcdir, page_rel))
-        if not date_info:
-            date_info = cast(str, app.config.all_article_info_date)
+def _render_article_info(
+    article_info: str,
+    *,
+    os_info: str,
+    author: str,
+    date_info: str | None,
+    read_time: str | None,
+) -> str:
+    """Fill in the article info template.
 
-        modified_info = article_info.replace("<!--os-info-->", article_os_info)
-        modified_info = modified_info.replace(
-            "<!--author-info-->", app.config.all_article_info_author
-        )
+    An empty date or read time also removes its icon; ``None`` leaves the
+    placeholder in place.
+    """
+    modified_info = article_info.replace("<!--os-info-->", os_info)
+    modified_info = modified_info.replace("<!--author-info-->", author)
+    if date_info == "":
+        modified_info = _remove_svg_span(modified_info, "article-info-date-svg")
+    if date_info is not None:
         modified_info = modified_info.replace("<!--date-info-->", date_info)
-        modified_info = modified_info.replace(
-            "<!--read-info-->", _estimate_read_time(page)
+    if read_time == "":
+        modified_info = _remove_svg_span(
+            modified_info, "article-info-read-time-svg"
         )
+    if read_time is not None:
+        modified_info = modified_info.replace("<!--read-info-->", read_time)
+    return modified_info
+
+
+def _count_words(doctree: nodes.document) -> int:
+    """Count the words of the visible text of a document."""
+    count = 0
+    stack: list[nodes.Node] = [doctree]
+    while stack:
+        node = stack.pop()
+        # Comments, targets, substitution definitions and raw markup
+        if isinstance(node, (nodes.Invisible, nodes.raw)):
+            continue
+        if isinstance(node, nodes.Text):
+            count += len(re.findall(r"\w+", node.astext()))
+        else:
+            stack.extend(node.children)
+    return count
 
-        _write_article_info(page, modified_info)
 
+def _word_counts(env: BuildEnvironment) -> dict[str, int]:
+    if not hasattr(env, "rocm_docs_word_counts"):
+        env.rocm_docs_word_counts = {}  # type: ignore[attr-defined]
+    counts: dict[str, int] = env.rocm_docs_word_counts  # type: ignore[attr-defined]
+    return counts
 
-def _get_time_last_modified(repo: git.repo.Repo, path: Path) -> str | None:
-    try:
-        time = next(
-            repo.iter_commits(paths=path, max_count=1)
-        ).committed_datetime
-        return time.strftime("%Y-%m-%d")
-    except StopIteration:
-        return None
 
+class ReadTimeCollector(EnvironmentCollector):
+    """Count the words of each document while it is read.
 
-def _estimate_read_time(file_name: Path) -> str:
-    def is_visible(element):
-        if element.parent.name in [
-            "style",
-            "script",
-            "[document]",
-            "head",
-            "title",
-        ]:
-            return False
-        if isinstance(element, bs4.element.Comment):
-            return False
-        return element.string != "\n"
-
-    def count_words(text):
-        words = re.findall(r"\w+", text)
-        return len(words)
+    The counts are stored in the build environment, so they survive
+    incremental builds and are merged back from parallel readers.
+    """
 
+    def clear_doc(
+        self,
+        app: Sphinx,  # noqa: ARG002
+        env: BuildEnvironment,
+        docname: str,
+    ) -> None:
+        """Forget the word count of a removed or outdated document."""
+        _word_counts(env).pop(docname, None)
+
+    def merge_other(
+        self,
+        app: Sphinx,  # noqa: ARG002
+        env: BuildEnvironment,
+        docnames: Set[str],
+        other: BuildEnvironment,
+    ) -> None:
+        """Take over the word counts of documents read by another process."""
+        counts = _word_counts(env)
+        other_counts = _word_counts(other)
+        for docname in docnames:
+            if docname in other_counts:
+                counts[docname] = other_counts[docname]
+
+    def process_doc(self, app: Sphinx, doctree: nodes.document) -> None:
+        """Count the words of a document that has just been read."""
+        _word_counts(app.env)[app.env.docname] = _count_words(doctree)
+
+
+def _estimate_read_time(env: BuildEnvironment, docname: str) -> str:
     words_per_minute = 200
 
-    with open(file_name, encoding="utf-8") as file:
-        html = file.read()
-    soup = bs4.BeautifulSoup(html, "html.parser")
-    article = soup.find("article") or soup.find("main") or soup
-    page_text = article.find_all(text=True)
-    visible_page_text = filter(is_visible, page_text)
-    average_word_count = sum(count_words(line) for line in visible_page_text)
-    time_minutes = int(max(1, round(average_word_count / words_per_minute)))
+    word_count = _word_counts(env).get(docname, 0)
+    time_minutes = int(max(1, round(word_count / words_per_minute)))
     return f"{time_minutes} min read time"
 
 
-def _write_article_info(path: os.PathLike[Any], article_info: str) -> None:
-    with open(path, "r+", encoding="utf8") as file:
-        page_html = file.read()
-        soup = bs4.BeautifulSoup(page_html, "html.parser")
-
-        has_article_info = soup.find("div", id="rocm-docs-core-article-info")
-        if (
-            has_article_info is not None
-            or soup.article is None
-            or soup.article.h1 is None
-        ):
-            return
-
-        soup.article.h1.insert_after(
-            bs4.BeautifulSoup(article_info, "html.parser")
-        )
-        file.seek(0)
-        file.truncate(0)
-        file.write(str(soup))
+def install(app: Sphinx) -> None:
+    """Count words while reading and add article info while writing."""
+    app.add_env_collector(ReadTimeCollector)
+    renderer = _ArticleInfoRenderer()
+    app.connect("env-get-outdated", renderer.env_get_outdated)
+    app.connect("html-page-context", renderer.html_page_context)
+    output.register_stage(app, "article_info", renderer.output_files)
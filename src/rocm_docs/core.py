@@ -21,7 +21,16 @@ from sphinx.application import Sphinx
 from sphinx.config import Config
 from sphinx.errors import ExtensionError
 
-from rocm_docs import article_info, llms
+from rocm_docs import (
+    article_info,
+    llms,
+    mathml,
+    output,
+    page_weight,
+    postprocess,
+    search,
+    sitemap,
+)
 
 T = TypeVar("T")
 
@@ -141,6 +150,25 @@ def _setup_llms_extension(app: Sphinx, _: Config) -> None:
     app.setup_extension("sphinx_markdown_builder")
 
 
+def _setup_math_prerender(app: Sphinx, _: Config) -> None:
+    """Select the MathML renderer when math prerendering is enabled.
+
+    ``latex2mathml`` is an optional dependency (the ``math`` extra), so it is
+    only required, and a clear error raised if it is missing, when
+    ``rocm_docs_math_prerender`` is enabled.
+    """
+    if not app.config.rocm_docs_math_prerender:
+        return
+    try:
+        import latex2mathml  # noqa: F401
+    except ImportError as err:
+        raise ExtensionError(
+            "rocm_docs_math_prerender is enabled but 'latex2mathml' is not "
+            "installed. Install it with: pip install rocm-docs-core[math]"
+        ) from err
+    mathml.install(app)
+
+
 def setup(app: Sphinx) -> dict[str, Any]:
     """Set up rocm_docs.core as a Sphinx extension."""
     required_extensions = [
@@ -196,13 +224,104 @@ def setup(app: Sphinx) -> dict[str, Any]:
         rebuild="html",
         types=list,
     )
+    app.add_config_value(
+        "rocm_docs_llms_full_shard_size",
+        default=0,
+        rebuild="",
+        types=int,
+    )
+    app.add_config_value(
+        "rocm_docs_llms_full_shard_tokens",
+        default=0,
+        rebuild="",
+        types=int,
+    )
+    app.add_config_value(
+        "rocm_docs_llms_tokenizer",
+        default=None,
+        rebuild="",
+    )
+    app.add_config_value(
+        "rocm_docs_llms_token_budget",
+        default=0,
+        rebuild="",
+        types=int,
+    )
+    app.add_config_value(
+        "rocm_docs_math_prerender",
+        default=False,
+        rebuild="html",
+        types=bool,
+    )
+    app.add_config_value(
+        "rocm_docs_search_index",
+        default=False,
+        rebuild="html",
+        types=bool,
+    )
+    app.add_config_value(
+        "rocm_docs_page_weight_report",
+        default=False,
+        rebuild="",
+        types=bool,
+    )
+    app.add_config_value(
+        "rocm_docs_page_weight_top_n",
+        default=10,
+        rebuild="",
+        types=int,
+    )
+    app.add_config_value(
+        "rocm_docs_page_weight_budgets",
+        default={},
+        rebuild="",
+        types=dict,
+    )
+    app.add_config_value(
+        "rocm_docs_skip_unchanged_writes",
+        default=False,
+        rebuild="",
+        types=bool,
+    )
+    app.add_config_value(
+        "rocm_docs_deploy_manifest",
+        default=False,
+        rebuild="",
+        types=bool,
+    )
+    app.add_config_value(
+        "rocm_docs_hardlink_files",
+        default=False,
+        rebuild="",
+        types=bool,
+    )
+    app.add_config_value(
+        "rocm_docs_sitemap",
+        default=False,
+        rebuild="",
+        types=bool,
+    )
 
     # Run before notfound.extension sees the config (default priority(=500))
     app.connect("config-inited", _force_notfound_prefix, priority=400)
     # Register the optional Markdown builder before other config-inited handlers
     # so its config values are available for the rest of the build.
     app.connect("config-inited", _setup_llms_extension, priority=300)
+    app.connect("config-inited", _setup_math_prerender)
     app.connect("config-inited", _DefaultSettings.update_config)
-    app.connect("build-finished", article_info.set_article_info, priority=1000)
+    app.connect("builder-inited", search.add_search_client)
+    article_info.install(app)
     app.connect("build-finished", _generate_llms_full)
-    return {"parallel_read_safe": True, "parallel_write_safe": True}
+    app.connect("build-finished", search.write_search_index)
+    app.connect("build-finished", sitemap.write_sitemap)
+    postprocess.register_transform(app, page_weight.page_weight_transform())
+    # Run after all other build-finished handlers have written their files.
+    app.connect("build-finished", output.finish_outputs, priority=900)
+    output.register_stage(app, "llms", llms.output_files)
+    output.register_stage(app, "search", search.output_files)
+    output.register_stage(app, "sitemap", sitemap.output_files)
+    return {
+        "env_version": 1,
+        "parallel_read_safe": True,
+        "parallel_write_safe": True,
+    }
@@ -0,0 +1,237 @@
+// Client for the prefix-sharded search index written by rocm_docs.search.
+// The manifest is loaded on the first query, and afterwards only the shards
+// whose prefix matches a query term are fetched (and cached for the session).
+(() => {
+    "use strict";
+
+    const MAX_RESULTS = 20;
+    const rootUrl = new URL(
+        document.documentElement.dataset.content_root || "./",
+        document.baseURI
+    );
+    const indexUrl = new URL("_search/", rootUrl);
+    // Tells search.js not to forward to the Read the Docs search.
+    document.documentElement.dataset.rocmDocsSearch = "local";
+
+    let manifestPromise = null;
+    let stemmerPromise = null;
+    const shardPromises = new Map();
+
+    const toHex = (text) =>
+        Array.from(new TextEncoder().encode(text), (b) =>
+            b.toString(16).padStart(2, "0")
+        ).join("");
+
+    async function fetchJson(url) {
+        const response = await fetch(url);
+        if (!response.ok) {
+            throw new Error(`Failed to load ${url}: ${response.status}`);
+        }
+        let bytes = new Uint8Array(await response.arrayBuffer());
+        // Servers may already have removed the gzip encoding.
+        if (bytes[0] === 0x1f && bytes[1] === 0x8b) {
+            const stream = new Blob([bytes])
+                .stream()
+                .pipeThrough(new DecompressionStream("gzip"));
+            bytes = new Uint8Array(await new Response(stream).arrayBuffer());
+        }
+        return JSON.parse(new TextDecoder().decode(bytes));
+    }
+
+    function loadManifest() {
+        manifestPromise ??= fetchJson(new URL("manifest.json.gz", indexUrl)).then(
+            (manifest) => ({ ...manifest, shardKeys: new Set(manifest.shards) })
+        );
+        return manifestPromise;
+    }
+
+    function loadShard(manifest, key) {
+        if (!manifest.shardKeys.has(key)) {
+            return Promise.resolve(null);
+        }
+        if (!shardPromises.has(key)) {
+            const url = new URL(`shard-${toHex(key)}.json.gz`, indexUrl);
+            shardPromises.set(key, fetchJson(url));
+        }
+        return shardPromises.get(key);
+    }
+
+    // The stemmer must match the one used to build the index, so reuse
+    // Sphinx's language_data.js, loading it on demand.
+    function loadStemmer() {
+        stemmerPromise ??= new Promise((resolve) => {
+            if (window.Stemmer) {
+                resolve(new window.Stemmer());
+                return;
+            }
+            const script = document.createElement("script");
+            script.src = new URL("_static/language_data.js", rootUrl).href;
+            script.onload = () =>
+                resolve(window.Stemmer ? new window.Stemmer() : null);
+            script.onerror = () => resolve(null);
+            document.head.append(script);
+        });
+        return stemmerPromise;
+    }
+
+    const prefixOf = (manifest, term) => term.slice(0, manifest.prefixLength);
+    const asList = (docs) => (Array.isArray(docs) ? docs : [docs]);
+
+    async function scoreWord(manifest, stemmer, word) {
+        const stem = stemmer ? stemmer.stemWord(word) : word;
+        const keys = new Set([prefixOf(manifest, word), prefixOf(manifest, stem)]);
+        const shards = await Promise.all(
+            [...keys].map((key) => loadShard(manifest, key))
+        );
+        const scores = new Map();
+        for (const shard of shards.filter(Boolean)) {
+            for (const [kind, weight] of [["titleterms", 15], ["terms", 5]]) {
+                for (const [term, docs] of Object.entries(shard[kind])) {
+                    let score = 0;
+                    if (term === stem || term === word) {
+                        score = weight;
+                    } else if (word.length > 2 && term.startsWith(word)) {
+                        score = weight / 3;
+                    }
+                    if (!score) {
+                        continue;
+                    }
+                    for (const doc of asList(docs)) {
+                        scores.set(doc, Math.max(scores.get(doc) || 0, score));
+                    }
+                }
+            }
+        }
+        return scores;
+    }
+
+    async function searchObjects(manifest, query) {
+        const needle = query.replace(/\s+/g, "");
+        // Objects are sharded by the last component of their name, split at
+        // "." and "::" like in rocm_docs.search.object_shard_key.
+        const name = needle.split(/[.:]+/).filter(Boolean).pop();
+        if (!name) {
+            return [];
+        }
+        const shard = await loadShard(manifest, prefixOf(manifest, name));
+        if (!shard) {
+            return [];
+        }
+        const results = [];
+        for (const [doc, type, prio, anchor, fullname] of shard.objects) {
+            const lower = fullname.toLowerCase();
+            if (!lower.includes(needle)) {
+                continue;
+            }
+            const exact =
+                lower === needle ||
+                lower.endsWith("." + needle) ||
+                lower.endsWith("::" + needle);
+            results.push({
+                url: `${manifest.docurls[doc]}#${anchor}`,
+                title: fullname,
+                detail: manifest.objnames[type] || "",
+                score: (exact ? 30 : 11) - prio,
+            });
+        }
+        return results;
+    }
+
+    async function search(query) {
+        const lowered = query.toLowerCase().trim();
+        const words = lowered.split(/[^\p{L}\p{N}_]+/u).filter(Boolean);
+        if (!words.length) {
+            return [];
+        }
+        const [manifest, stemmer] = await Promise.all([
+            loadManifest(),
+            loadStemmer(),
+        ]);
+        // stopwords is a global defined by language_data.js.
+        const stop = typeof stopwords === "undefined" ? new Set() : stopwords;
+
+        let combined = null;
+        for (const word of words.filter((w) => !stop.has(w))) {
+            const scores = await scoreWord(manifest, stemmer, word);
+            if (combined === null) {
+                combined = scores;
+                continue;
+            }
+            // All words must match, as in Sphinx's own search.
+            const merged = new Map();
+            for (const [doc, score] of scores) {
+                if (combined.has(doc)) {
+                    merged.set(doc, combined.get(doc) + score);
+                }
+            }
+            combined = merged;
+        }
+
+        const results = await searchObjects(manifest, lowered);
+        for (const [doc, score] of combined || []) {
+            results.push({
+                url: manifest.docurls[doc],
+                title: manifest.titles[doc],
+                detail: "",
+                score,
+            });
+        }
+        results.sort((a, b) => b.score - a.score);
+        return results.slice(0, MAX_RESULTS);
+    }
+
+    function render(list, results) {
+        list.replaceChildren(
+            ...results.map((result) => {
+                const item = document.createElement("li");
+                const link = document.createElement("a");
+                link.href = new URL(result.url, rootUrl).href;
+                // Titles and API names are HTML-escaped in the index.
+                const title = new DOMParser().parseFromString(
+                    result.title,
+                    "text/html"
+                );
+                link.textContent = title.documentElement.textContent;
+                item.append(link);
+                if (result.detail) {
+                    const detail = document.createElement("span");
+                    detail.className = "rocm-search-results__detail";
+                    detail.textContent = result.detail;
+                    item.append(detail);
+                }
+                return item;
+            })
+        );
+        list.hidden = results.length === 0;
+    }
+
+    function attach(form) {
+        const input = form.querySelector("input[name='q']");
+        if (!input) {
+            return;
+        }
+        const list = document.createElement("ul");
+        list.className = "rocm-search-results";
+        list.hidden = true;
+        form.after(list);
+
+        let timer = null;
+        let latest = 0;
+        input.addEventListener("input", () => {
+            clearTimeout(timer);
+            timer = setTimeout(async () => {
+                const current = ++latest;
+                try {
+                    const results = await search(input.value);
+                    if (current === latest) {
+                        render(list, results);
+                    }
+                } catch (error) {
+                    console.error("rocm-docs search:", error);
+                }
+            }, 150);
+        });
+    }
+
+    document.querySelectorAll("form.bd-search").forEach(attach);
+})();
@@ -0,0 +1,115 @@
+"""List the files to upload and to delete to deploy a new build.
+
+Compares the deploy manifest of the deployed site, written by a previous
+build with ``rocm_docs_deploy_manifest = True``, with the manifest of a new
+build::
+
+    python -m rocm_docs.deploy old.json new.json --upload up.txt --delete rm.txt
+
+Files are compared by size and SHA-256 hash, so files that were rebuilt with
+the same content are not uploaded again.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from rocm_docs import output
+
+
+def _read_manifest(
+    path: Path, *, missing_ok: bool = False
+) -> dict[str, dict[str, Any]]:
+    """Return the files listed in the manifest at *path*.
+
+    With *missing_ok*, a missing manifest lists no files, as for the deployed
+    site of a first deployment.
+    """
+    if missing_ok and not path.exists():
+        return {}
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+        version = manifest.get("version")
+        files: dict[str, dict[str, Any]] = manifest["files"]
+        for name, entry in files.items():
+            if not {"sha256", "size"} <= entry.keys():
+                raise KeyError(f"{name}: missing sha256 or size")
+    except (ValueError, AttributeError, KeyError, TypeError) as err:
+        raise ValueError(f"{path}: not a deploy manifest ({err})") from err
+    if version != output.MANIFEST_VERSION:
+        raise ValueError(f"{path}: unsupported manifest version {version!r}")
+    return files
+
+
+def diff_manifests(
+    old: dict[str, dict[str, Any]], new: dict[str, dict[str, Any]]
+) -> tuple[list[str], list[str]]:
+    """Return the files to upload and to delete to go from *old* to *new*."""
+    upload = sorted(
+        name
+        for name, entry in new.items()
+        if name not in old
+        or (old[name]["sha256"], old[name]["size"])
+        != (entry["sha256"], entry["size"])
+    )
+    delete = sorted(old.keys() - new.keys())
+    return upload, delete
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Diff two deploy manifests into lists of files to upload and delete."""
+    parser = argparse.ArgumentParser(
+        prog="python -m rocm_docs.deploy",
+        description=(
+            "Compare the deploy manifest of the deployed site with the one of"
+            " a new build and list the files to upload and to delete, one"
+            " path per line."
+        ),
+    )
+    parser.add_argument(
+        "old",
+        type=Path,
+        help="manifest of the deployed site; a missing file means no files",
+    )
+    parser.add_argument("new", type=Path, help="manifest of the new build")
+    parser.add_argument(
+        "--upload",
+        type=Path,
+        help="write the files to upload to this file instead of stdout",
+    )
+    parser.add_argument(
+        "--delete",
+        type=Path,
+        help="write the files to delete to this file instead of stdout",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        old = _read_manifest(args.old, missing_ok=True)
+        # A missing manifest of the new build must not delete every file.
+        new = _read_manifest(args.new)
+    except (OSError, ValueError) as err:
+        parser.error(str(err))
+    upload, delete = diff_manifests(old, new)
+
+    for names, target, label in (
+        (upload, args.upload, "upload"),
+        (delete, args.delete, "delete"),
+    ):
+        if target is not None:
+            target.write_text(
+                "".join(f"{name}\n" for name in names), encoding="utf-8"
+            )
+        else:
+            for name in names:
+                print(f"{label} {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,18 +21,24 @@ from sphinx.config import Config
 from sphinx.errors import ConfigError, ExtensionError
 from sphinx.util import logging
 from sphinx.util.display import progress_message
-from sphinx.util.osutil import copyfile
+
+from rocm_docs import output
 
 logger = logging.getLogger(__name__)
 
 
+def _hardlink_files(app: Sphinx) -> bool:
+    # Declared by rocm_docs.core, which may not be loaded with this extension.
+    return bool(getattr(app.config, "rocm_docs_hardlink_files", False))
+
+
 def _copy_files(app: Sphinx) -> None:
     """Insert additional files into workspace."""
     with importlib.resources.path("rocm_docs", "") as pkg_path:
-        shutil.copytree(
+        output.place_tree(
             pkg_path / "data/_doxygen",
             Path(app.srcdir, "_doxygen"),
-            dirs_exist_ok=True,
+            hardlink=_hardlink_files(app),
         )
 
 
@@ -204,11 +210,18 @@ def _copy_tagfile(app: Sphinx) -> None:
     dst = Path(app.outdir, src.name)
     with progress_message("copying doxygen tagfile"):
         try:
-            copyfile(str(src), str(dst))
+            output.place_file(src, dst, hardlink=_hardlink_files(app))
         except OSError as err:
             raise ExtensionError(f"Failed to copy tag file: {err}") from err
 
 
+def _output_files(app: Sphinx) -> list[str]:
+    """Return the doxygen output in the output directory."""
+    if app.config.doxygen_html is None:
+        return []
+    return [f"{Path(app.config.doxygen_html).as_posix()}/", "tagfile.xml"]
+
+
 def setup(app: Sphinx) -> dict[str, Any]:
     """Set up rocm_docs.doxygen as a Sphinx extension."""
     app.setup_extension("sphinx.ext.mathjax")
@@ -249,5 +262,6 @@ def setup(app: Sphinx) -> dict[str, Any]:
     # Should run after projects.py's config (if enabled) as it provides values
     # based on the contents projects.yaml, needs access to the builder
     app.connect("builder-inited", _copy_tagfile)
+    output.register_stage(app, "doxygen", _output_files)
 
     return {"parallel_read_safe": True, "parallel_write_safe": True}
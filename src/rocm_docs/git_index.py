@@ -0,0 +1,171 @@
+"""Look up when files were last modified in git, for many files at once."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import json
+import os
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from git.exc import GitCommandError
+from git.repo import Repo
+
+DATE_FORMAT = "%Y-%m-%d"
+
+# Default file name of the date cache, stored in the doctree directory.
+CACHE_FILENAME = "rocm_docs_git_dates.json"
+
+# Marks the start of a commit in the ``git log`` output. File names follow,
+# each terminated by a NUL byte.
+_COMMIT_MARKER = "\x01"
+
+
+def _iter_log(repo: Repo, *args: str) -> Iterator[tuple[str, list[str]]]:
+    """Yield ``(date, files)`` for each commit of ``git log *args``.
+
+    Commits are read from the output of a single ``git log`` process as it
+    is produced, so stopping the iteration early stops the history walk.
+    """
+    proc: Any = repo.git.log(
+        f"--format=%x00{_COMMIT_MARKER}%cd",
+        f"--date=format:{DATE_FORMAT}",
+        "--name-only",
+        "--no-renames",
+        "-z",
+        *args,
+        as_process=True,
+    )
+    date: str | None = None
+    files: list[str] = []
+    remainder = b""
+    try:
+        while chunk := proc.stdout.read1(1 << 16):
+            *tokens, remainder = (remainder + chunk).split(b"\0")
+            for raw in tokens:
+                token = os.fsdecode(raw).lstrip("\n")
+                if token.startswith(_COMMIT_MARKER):
+                    if date is not None:
+                        yield date, files
+                    date, files = token[1:], []
+                elif token:
+                    files.append(token)
+        if date is not None:
+            yield date, files
+    finally:
+        proc.proc.kill()
+        proc.proc.wait()
+
+
+class _DateCache:
+    """Dates of repository files as of one commit, stored as JSON.
+
+    ``dates`` maps paths relative to the repository root to the date of the
+    last commit modifying them. ``missing`` holds paths that were looked up
+    but have no commit. When HEAD moves forward, only the commits since the
+    cached one are read to update the known paths.
+    """
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self.head: str | None = None
+        self.dates: dict[str, str] = {}
+        self.missing: set[str] = set()
+        if path is None:
+            return
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            self.head = data["head"]
+            self.dates = dict(data["dates"])
+            self.missing = set(data["missing"])
+        except (OSError, ValueError, KeyError, TypeError):
+            self.head = None
+
+    def update(self, repo: Repo, head: str) -> None:
+        """Bring the cache from its commit to *head*."""
+        if self.head == head:
+            return
+        usable = self.head is not None
+        if usable:
+            try:
+                repo.git.merge_base("--is-ancestor", self.head, head)
+            except GitCommandError:  # not an ancestor, or an unknown commit
+                usable = False
+        if not usable:
+            self.dates.clear()
+            self.missing.clear()
+        else:
+            known = self.missing.union(self.dates)
+            # Merged commits may be older than the cached date of a path, so
+            # the newest date wins, like in a walk of the whole history.
+            for date, files in _iter_log(repo, f"{self.head}..{head}"):
+                for file in known.intersection(files):
+                    self.dates[file] = max(self.dates.get(file, date), date)
+                    self.missing.discard(file)
+        self.head = head
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        data = {
+            "head": self.head,
+            "dates": self.dates,
+            "missing": sorted(self.missing),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def last_modified_dates(
+    repo: Repo,
+    paths: Iterable[str | os.PathLike[Any]],
+    cache_path: str | os.PathLike[Any] | None = None,
+) -> dict[Path, str]:
+    """Return the date of the last commit that modified each of *paths*.
+
+    History is walked once, newest commit first, and the walk stops as soon
+    as the dates of all *paths* are known. Paths outside of the repository
+    or without any commit are missing from the result.
+
+    With *cache_path*, the dates are stored in that file together with the
+    HEAD commit. Later calls only read the commits added since then, and
+    walk history only for paths that were not looked up before.
+    """
+    root = Path(str(repo.working_tree_dir)).resolve()
+    wanted: dict[str, list[Path]] = {}
+    for path in paths:
+        try:
+            rel = Path(path).resolve().relative_to(root).as_posix()
+        except ValueError:
+            continue
+        wanted.setdefault(rel, []).append(Path(path))
+    try:
+        head = repo.head.commit.hexsha
+    except ValueError:  # no commits yet
+        return {}
+    if not wanted:
+        return {}
+
+    cache = _DateCache(None if cache_path is None else Path(cache_path))
+    cache.update(repo, head)
+    unresolved = set(wanted).difference(cache.dates, cache.missing)
+    if unresolved:
+        # Only commits touching the common directory of the paths are listed.
+        scope = os.path.commonpath(unresolved)
+        log_args = [head, "--", scope] if scope else [head]
+        for date, files in _iter_log(repo, *log_args):
+            for file in unresolved.intersection(files):
+                unresolved.discard(file)
+                cache.dates[file] = date
+            if not unresolved:
+                break
+        cache.missing.update(unresolved)
+    cache.save()
+
+    return {
+        path: cache.dates[rel]
+        for rel, rel_paths in wanted.items()
+        if rel in cache.dates
+        for path in rel_paths
+    }
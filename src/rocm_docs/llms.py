@@ -13,6 +13,17 @@ output directory:
   RST ``.. meta::`` directive), falling back to the page title.
 * ``llms-full.txt`` -- the prose documentation inlined into a single file.
 
+With ``rocm_docs_llms_full_shard_size`` or ``rocm_docs_llms_full_shard_tokens``
+set, the pages of ``llms-full.txt`` are also split along the sections of the
+table of contents into files of about that many bytes or tokens
+(``llms-full-001.txt``, ...), which are listed in ``llms-full-manifest.txt``
+and linked from ``llms.txt``.
+
+The tokens of each page are estimated with ``rocm_docs_llms_tokenizer``, by
+default from its length, and reported in ``llms-tokens.json`` in the doctree
+directory. With ``rocm_docs_llms_token_budget`` set, the largest pages are
+moved to the index only until ``llms-full.txt`` fits the budget.
+
 Unlike a text-level filter, the content is produced from Sphinx's *resolved*
 doctree using ``sphinx-markdown-builder``'s translator, so RST and Markdown
 sources are handled identically and constructs like tables, code blocks,
@@ -21,24 +32,33 @@ math, footnotes, and cross-references survive conversion intact.
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, TextIO
 
+import hashlib
+import importlib.metadata
+import json
 import logging
 import os
-from collections.abc import Iterator
+import pickle
+import shutil
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass, field
 from fnmatch import fnmatch
 from html.parser import HTMLParser
 from pathlib import Path
 
+import sphinx
 import sphinx.util.logging
 from docutils import nodes
 from docutils.io import StringOutput
 from sphinx.application import Sphinx
+from sphinx.util.parallel import ParallelTasks, parallel_available
 from sphinx_design.tabs import sd_tab_input, sd_tab_label
 from sphinx_external_toc.api import FileItem, SiteMap, UrlItem
 from sphinx_external_toc.parsing import parse_toc_yaml
 
+from rocm_docs import output
+
 if TYPE_CHECKING:
     # Only needed for type checking. sphinx-markdown-builder is an optional
     # dependency (installed via the ``llms`` extra); the runtime import happens
@@ -55,6 +75,24 @@ logger = sphinx.util.logging.getLogger(__name__)
 
 INDEX_FILENAME = "llms.txt"
 FULL_FILENAME = "llms-full.txt"
+# Parts of the full text and the list of them, written when
+# ``rocm_docs_llms_full_shard_size`` or ``rocm_docs_llms_full_shard_tokens``
+# is set.
+SHARD_FILENAME = "llms-full-{index:03d}.txt"
+SHARD_MANIFEST_FILENAME = "llms-full-manifest.txt"
+
+# Folder of the rendered page cache, in the doctree directory.
+CACHE_DIRNAME = "rocm_docs_llms_cache"
+
+# Token estimates of the pages, written to the doctree directory.
+TOKEN_REPORT_FILENAME = "llms-tokens.json"
+
+# Characters per token assumed by estimate_tokens, a common rule of thumb for
+# English prose.
+CHARS_PER_TOKEN = 4
+
+# Number of the largest pages logged by the token report.
+_TOKEN_REPORT_TOP_N = 10
 
 # Generated API-reference pages (doxygen/autodoc dumps) are noisy as prose and
 # are linked rather than inlined. Doxysphinx emits pages under a ``doxygen/html``
@@ -93,6 +131,17 @@ class _TocEntry:
     depth: int
 
 
+def output_files(app: Sphinx) -> list[str]:
+    """Return the files written by :func:`generate_llms_full`."""
+    if not app.config.rocm_docs_generate_llms:
+        return []
+    files = [INDEX_FILENAME, FULL_FILENAME]
+    if _sharded(app):
+        files.append(SHARD_MANIFEST_FILENAME)
+        files += sorted(path.name for path in _shard_paths(Path(app.outdir)))
+    return files
+
+
 def generate_llms_full(app: Sphinx, exception: object) -> None:
     """Write ``llms.txt`` and ``llms-full.txt`` to the output directory.
 
@@ -107,12 +156,14 @@ def generate_llms_full(app: Sphinx, exception: object) -> None:
         return
 
     base_url = _resolve_base_url(app)
-    builder, writer = _build_markdown_renderer(app)
 
-    # Rewrite internal links to absolute published URLs for the duration of the
-    # render loop, then restore the original value so nothing else is affected.
+    # Rewrite internal links to absolute published URLs of the HTML pages for
+    # the duration of the render loop, then restore the original values so
+    # nothing else is affected. Both are part of the render cache keys.
     saved_http_base = app.config.markdown_http_base
+    saved_doc_suffix = app.config.markdown_uri_doc_suffix
     app.config.markdown_http_base = base_url
+    app.config.markdown_uri_doc_suffix = ".html"
     # The "unknown node type" warning is emitted by SphinxTranslator via
     # ``sphinx.util.logging.getLogger(__name__)``, which prefixes the logger
     # name with "sphinx." -> "sphinx.sphinx.util.docutils".
@@ -121,37 +172,227 @@ def generate_llms_full(app: Sphinx, exception: object) -> None:
     docutils_logger.addFilter(downgrade_filter)
     try:
         entries = list(_iter_toc_pages(app))
-        rendered: dict[str, str] = {}
-        descriptions: dict[str, str] = {}
-        titles: dict[str, str] = {}
-        for entry in entries:
-            docname = entry.docname
-            if docname is None:
-                continue
-            doctree = app.env.get_and_resolve_doctree(docname, app.builder)
-            titles[docname] = entry.title or _page_title(doctree, docname)
-            descriptions[docname] = _extract_description(app, docname, doctree)
-            # Pages excluded from the full text are still listed in the index,
-            # but their body is not inlined. This covers generated/doxygen pages
-            # and very large pages that would otherwise dominate llms-full.txt.
-            if _is_excluded_from_fulltext(app, docname):
-                continue
-            rendered[docname] = _render_page_markdown(
-                builder, writer, doctree, docname
-            )
+        pages = _render_pages(app, entries)
     finally:
         docutils_logger.removeFilter(downgrade_filter)
         app.config.markdown_http_base = saved_http_base
+        app.config.markdown_uri_doc_suffix = saved_doc_suffix
 
-    index = _assemble_index(app, base_url, entries, titles, descriptions)
-    full = _assemble_full(index, entries, base_url, rendered)
+    titles: dict[str, str] = {}
+    descriptions: dict[str, str] = {}
+    for entry in entries:
+        docname = entry.docname
+        if docname is None:
+            continue
+        titles[docname] = entry.title or pages[docname].title
+        descriptions[docname] = pages[docname].description
+
+    index = _assemble_index(
+        app, base_url, entries, titles, descriptions, _sharded(app)
+    )
+    index_tokens = _tokenizer(app)(index)
+    tokens = {
+        docname: page.tokens
+        for docname, page in pages.items()
+        if page.cache_key is not None
+    }
+    index_only = _apply_token_budget(app, pages, index_tokens)
+    _report_tokens(app, tokens, index_tokens, index_only)
+
+    cache = _MarkdownCache(app)
+    shards = _shard_entries(app, base_url, entries, pages, cache)
 
     out_dir = Path(app.outdir)
-    (out_dir / INDEX_FILENAME).write_text(index, encoding="utf-8")
-    (out_dir / FULL_FILENAME).write_text(full, encoding="utf-8")
+    output.write_if_changed(out_dir / INDEX_FILENAME, index)
+    # The pages are copied from the render cache one by one, so the full
+    # text is never held in memory.
+    with output.replace_if_changed(out_dir / FULL_FILENAME) as full:
+        full.write(index.rstrip())
+        _write_pages(full, entries, base_url, pages, cache)
+        full.write("\n")
+    _write_shards(app, base_url, shards, titles, pages, cache)
     logger.info("Wrote %s and %s", INDEX_FILENAME, FULL_FILENAME)
 
 
+@dataclass
+class _RenderedPage:
+    """The parts of one page that the llms files are assembled from."""
+
+    title: str
+    description: str
+    # Key of the Markdown in the render cache, ``None`` if the page is
+    # excluded from the full text.
+    cache_key: str | None = None
+    cached: bool = False
+    # Estimated tokens of the Markdown, if the page is rendered.
+    tokens: int = 0
+
+
+def _package_version(name: str) -> str:
+    """Return the version of the package *name* for the render cache keys.
+
+    Without package metadata, e.g. when rocm-docs-core is used from a source
+    checkout, the hash of this module stands in for it.
+    """
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return output.file_digest(Path(__file__))
+
+
+def _qualified_name(obj: Any) -> str:
+    return f"{obj.__module__}.{obj.__qualname__}"
+
+
+class _MarkdownCache:
+    """Rendered Markdown of pages, stored as one file per page.
+
+    Each file is named after a hash of the docname, the pickled resolved
+    doctree, the section numbers, the link settings of the Markdown
+    translator, the registered node replacements and the versions of Sphinx,
+    rocm-docs-core and sphinx-markdown-builder, so a page is only rendered
+    again if one of them changed. Files are written by the process rendering
+    the page, and files not used by a build are removed at its end.
+    """
+
+    def __init__(self, app: Sphinx) -> None:
+        self.path = Path(app.doctreedir, CACHE_DIRNAME)
+        self.salt = "\0".join(
+            [
+                sphinx.__version__,
+                _package_version("rocm-docs-core"),
+                _package_version("sphinx-markdown-builder"),
+                str(app.config.markdown_http_base),
+                str(app.config.markdown_uri_doc_suffix),
+                *sorted(
+                    _qualified_name(node_type) + ":" + _qualified_name(replace)
+                    for node_type, replace in _NODE_REPLACEMENTS.items()
+                ),
+            ]
+        )
+
+    def key(self, app: Sphinx, docname: str, doctree: nodes.document) -> str:
+        digest = hashlib.sha256(f"{self.salt}\0{docname}\0".encode())
+        digest.update(repr(app.env.toc_secnumbers.get(docname)).encode())
+        # The document settings hold the environment and are not pickled,
+        # like when Sphinx writes the doctree to the doctree directory.
+        settings, reporter, transformer = (
+            doctree.settings,
+            doctree.reporter,
+            doctree.transformer,
+        )
+        doctree.settings = None  # type: ignore[assignment]
+        doctree.reporter = None  # type: ignore[assignment]
+        doctree.transformer = None  # type: ignore[assignment]
+        try:
+            digest.update(pickle.dumps(doctree, pickle.HIGHEST_PROTOCOL))
+        finally:
+            doctree.settings = settings
+            doctree.reporter = reporter
+            doctree.transformer = transformer
+        return digest.hexdigest()
+
+    def file(self, key: str) -> Path:
+        return self.path / f"{key}.md"
+
+    def put(self, key: str, markdown: str) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = self.path / f"{key}.{os.getpid()}.tmp"
+        tmp.write_bytes(markdown.encode("utf-8"))
+        os.replace(tmp, self.file(key))
+
+    def prune(self, keys: set[str]) -> None:
+        """Remove the cached pages whose key is not in *keys*."""
+        if not self.path.is_dir():
+            return
+        for path in self.path.iterdir():
+            if path.stem not in keys:
+                path.unlink(missing_ok=True)
+
+
+def _render_pages(
+    app: Sphinx, entries: list[_TocEntry]
+) -> dict[str, _RenderedPage]:
+    """Resolve and render the pages of *entries*, by docname.
+
+    When Sphinx runs with ``-j N``, the pages are split into chunks that are
+    rendered in forked worker processes, each with its own Markdown renderer.
+    """
+    docnames = list(
+        dict.fromkeys(e.docname for e in entries if e.docname is not None)
+    )
+    cache = _MarkdownCache(app)
+    pages = _render_in_chunks(app, docnames, cache)
+    cache.prune({page.cache_key for page in pages.values() if page.cache_key})
+    cached = sum(page.cached for page in pages.values())
+    logger.info(
+        "llms: rendered %d pages, reused %d from the cache",
+        sum(page.cache_key is not None for page in pages.values()) - cached,
+        cached,
+    )
+    return pages
+
+
+def _render_in_chunks(
+    app: Sphinx, docnames: list[str], cache: _MarkdownCache
+) -> dict[str, _RenderedPage]:
+    nproc = app.parallel if parallel_available else 1
+    if nproc <= 1 or len(docnames) <= 1:
+        return _render_chunk((app, docnames, cache))
+
+    # More chunks than processes, so that workers that get small pages pick
+    # up more chunks instead of waiting for the one with the largest pages.
+    size = max(1, -(-len(docnames) // (nproc * 4)))
+    pages: dict[str, _RenderedPage] = {}
+    tasks = ParallelTasks(nproc)
+    for start in range(0, len(docnames), size):
+        tasks.add_task(
+            _render_chunk,
+            (app, docnames[start : start + size], cache),
+            result_func=lambda _, result: pages.update(result),
+        )
+    tasks.join()
+    return pages
+
+
+def _render_chunk(
+    args: tuple[Sphinx, list[str], _MarkdownCache],
+) -> dict[str, _RenderedPage]:
+    """Render a chunk of pages to the cache, possibly in a worker process.
+
+    The Markdown renderer is only created if a page is not in the cache.
+    Only the cache keys and the token estimates are returned, not the
+    Markdown itself.
+    """
+    app, docnames, cache = args
+    renderer: tuple[MarkdownBuilder, MarkdownWriter] | None = None
+    tokenizer = _tokenizer(app)
+    pages: dict[str, _RenderedPage] = {}
+    for docname in docnames:
+        doctree = app.env.get_and_resolve_doctree(docname, app.builder)
+        page = pages[docname] = _RenderedPage(
+            title=_page_title(doctree, docname),
+            description=_extract_description(app, docname, doctree),
+        )
+        # Pages excluded from the full text are still listed in the index,
+        # but their body is not inlined. This covers generated/doxygen pages
+        # and very large pages that would otherwise dominate llms-full.txt.
+        if _is_excluded_from_fulltext(app, docname):
+            continue
+        page.cache_key = cache.key(app, docname, doctree)
+        path = cache.file(page.cache_key)
+        if path.is_file():
+            page.cached = True
+            markdown = path.read_text(encoding="utf-8")
+        else:
+            if renderer is None:
+                renderer = _build_markdown_renderer(app)
+            markdown = _render_page_markdown(*renderer, doctree, docname)
+            cache.put(page.cache_key, markdown)
+        page.tokens = tokenizer(markdown)
+    return pages
+
+
 def _build_markdown_renderer(
     app: Sphinx,
 ) -> tuple[MarkdownBuilder, MarkdownWriter]:
@@ -181,12 +422,17 @@ def _render_page_markdown(
     doctree: nodes.document,
     docname: str,
 ) -> str:
-    """Render one resolved doctree to a Markdown string (mirrors write_doc)."""
-    clean = _strip_unsupported_nodes(doctree)
+    """Render one resolved doctree to a Markdown string (mirrors write_doc).
+
+    The doctree is normalized in place. Each call of
+    ``get_and_resolve_doctree`` returns a fresh tree, read from the doctree
+    directory, so the caller owns it and no copy is needed.
+    """
+    _strip_unsupported_nodes(doctree)
     builder.current_doc_name = docname
     builder.sec_numbers = builder.env.toc_secnumbers.get(docname, {})
     destination = StringOutput(encoding="utf-8")
-    writer.write(clean, destination)
+    writer.write(doctree, destination)
     return str(writer.output).strip()
 
 
@@ -380,8 +626,8 @@ def _grid_to_table(grid: list[list[_HtmlCell]]) -> nodes.table | None:
     return table
 
 
-def _convert_raw_html_tables(clean: nodes.document) -> None:
-    """Convert raw HTML ``<table>`` nodes to docutils tables; drop other raw.
+def _raw_html_replacement(raw: nodes.Element) -> list[nodes.Node]:
+    """Convert a raw HTML ``<table>`` node to docutils tables; drop other raw.
 
     Markdown has no raw-HTML escape hatch in the generated output, so HTML
     ``<table>`` blocks (e.g. MyST ``{include}`` of ``.html`` support matrices)
@@ -389,65 +635,131 @@ def _convert_raw_html_tables(clean: nodes.document) -> None:
     by one or more real ``table`` nodes that the Markdown translator renders as
     GitHub-flavoured Markdown tables. ``raw`` nodes with no table are removed.
     """
-    for raw in list(clean.findall(nodes.raw)):
-        if raw.get("format") != "html":
-            continue
-        text = raw.astext()
-        if "<table" not in text.lower():
-            raw.parent.remove(raw)
-            continue
-        parser = _HtmlTableParser()
-        try:
-            parser.feed(text)
-            parser.close()
-        except Exception:  # pragma: no cover - defensive: malformed HTML
-            raw.parent.remove(raw)
-            continue
-        replacements: list[nodes.Element] = []
-        for rows in parser.tables:
-            table = _grid_to_table(_expand_grid(rows))
-            if table is not None:
-                replacements.append(table)
-        if replacements:
-            raw.replace_self(replacements)
-        else:
-            raw.parent.remove(raw)
+    if raw.get("format") != "html":
+        return [raw]
+    text = raw.astext()
+    if "<table" not in text.lower():
+        return []
+    parser = _HtmlTableParser()
+    try:
+        parser.feed(text)
+        parser.close()
+    except Exception:  # pragma: no cover - defensive: malformed HTML
+        return []
+    replacements: list[nodes.Node] = []
+    for rows in parser.tables:
+        table = _grid_to_table(_expand_grid(rows))
+        if table is not None:
+            replacements.append(table)
+    return replacements
+
+
+def _admonition_replacement(admonition: nodes.Element) -> list[nodes.Node]:
+    if isinstance(admonition, _SUPPORTED_ADMONITIONS):
+        return [admonition]
+    return [nodes.note("", *admonition.children)]
+
+
+def _tab_label_replacement(label: nodes.Element) -> list[nodes.Node]:
+    para = nodes.paragraph()
+    para += nodes.strong(text=label.astext())
+    return [para]
+
+
+# Replacements applied to the doctree by _strip_unsupported_nodes, by node
+# type. Filled with register_node_replacement, see below.
+_NODE_REPLACEMENTS: dict[type, Callable[[nodes.Element], list[nodes.Node]]] = {}
+# The replacement of each concrete node type seen so far, ``None`` if none
+# applies. Cleared whenever a replacement is registered.
+_DISPATCH: dict[type, Callable[[nodes.Element], list[nodes.Node]] | None] = {}
+
+
+def register_node_replacement(
+    node_type: type, replace: Callable[[nodes.Element], list[nodes.Node]]
+) -> None:
+    """Replace *node_type* nodes before pages are rendered to Markdown.
+
+    *replace* is called with each node that is an instance of *node_type*,
+    including subclasses and mixins like :class:`docutils.nodes.Admonition`,
+    and returns the nodes to put in its place: an empty list removes it, and
+    ``[node]`` keeps it. If several registered types match a node, the one
+    closest in its class hierarchy is used. The children of the returned
+    nodes are normalized as well, but the returned nodes themselves are not
+    passed to a replacement again.
+    """
+    _NODE_REPLACEMENTS[node_type] = replace
+    _DISPATCH.clear()
 
 
-def _strip_unsupported_nodes(doctree: nodes.document) -> nodes.document:
-    """Return a copy of *doctree* normalized for the Markdown translator.
+def _replacement_for(
+    node_type: type,
+) -> Callable[[nodes.Element], list[nodes.Node]] | None:
+    try:
+        return _DISPATCH[node_type]
+    except KeyError:
+        pass
+    replace = next(
+        (
+            _NODE_REPLACEMENTS[cls]
+            for cls in node_type.__mro__
+            if cls in _NODE_REPLACEMENTS
+        ),
+        None,
+    )
+    _DISPATCH[node_type] = replace
+    return replace
+
 
-    sphinx-markdown-builder has no visitor for several node types that would
-    otherwise be dropped silently. To keep the output faithful:
+def _strip_unsupported_nodes(doctree: nodes.document) -> None:
+    """Normalize *doctree* in place for the Markdown translator.
 
-    * ``meta`` nodes are removed (they carry no prose).
-    * Admonitions the translator cannot render are converted to ``note`` so
-      their content is preserved.
-    * ``sphinx-design`` tab labels are converted to a bold paragraph so the tab
-      identity (e.g. "AMD" vs "NVIDIA", "Linux" vs "Windows") is not lost, which
-      otherwise risks conflating platform-specific instructions. The associated
-      radio-button ``sd_tab_input`` nodes carry no text and are removed.
-    * Raw HTML ``<table>`` blocks are converted to real Markdown tables and
-      other raw HTML is dropped, since the Markdown output has no HTML escape
-      hatch.
+    All registered replacements are applied in a single walk down the tree,
+    looked up by the type of each node. Parents are tracked while walking
+    rather than read from the ``parent`` attribute, which some extensions
+    leave unset (e.g. on ``sd_tab_input``). A parent's children are only
+    rebuilt if one of them is replaced.
     """
-    clean = doctree.deepcopy()
-    for meta in list(clean.findall(nodes.meta)):
-        meta.parent.remove(meta)
-    for element in list(clean.findall(nodes.Element)):
-        if not isinstance(element, nodes.Admonition):
-            continue
-        if isinstance(element, _SUPPORTED_ADMONITIONS):
-            continue
-        element.replace_self(nodes.note("", *element.children))
-    for tab_input in list(clean.findall(sd_tab_input)):
-        tab_input.parent.remove(tab_input)
-    for label in list(clean.findall(sd_tab_label)):
-        para = nodes.paragraph()
-        para += nodes.strong(text=label.astext())
-        label.replace_self(para)
-    _convert_raw_html_tables(clean)
-    return clean
+    stack: list[nodes.Element] = [doctree]
+    while stack:
+        parent = stack.pop()
+        children: list[nodes.Node] | None = None
+        for index, child in enumerate(parent.children):
+            replace = _replacement_for(type(child))
+            if replace is None:
+                if children is not None:
+                    children.append(child)
+                continue
+            if children is None:
+                children = list(parent.children[:index])
+            assert isinstance(child, nodes.Element)
+            children.extend(replace(child))
+        if children is not None:
+            parent.children = []
+            parent.extend(children)
+        stack.extend(
+            child
+            for child in parent.children
+            if isinstance(child, nodes.Element)
+        )
+
+
+# sphinx-markdown-builder has no visitor for several node types, which would
+# otherwise be dropped silently. To keep the output faithful:
+#
+# * ``meta`` nodes are removed (they carry no prose).
+# * Admonitions the translator cannot render are converted to ``note`` so their
+#   content is preserved.
+# * ``sphinx-design`` tab labels are converted to a bold paragraph so the tab
+#   identity (e.g. "AMD" vs "NVIDIA", "Linux" vs "Windows") is not lost, which
+#   otherwise risks conflating platform-specific instructions. The associated
+#   radio-button ``sd_tab_input`` nodes carry no text and are removed.
+# * Raw HTML ``<table>`` blocks are converted to real Markdown tables and other
+#   raw HTML is dropped, since the Markdown output has no HTML escape hatch.
+register_node_replacement(nodes.meta, lambda _: [])
+register_node_replacement(nodes.Admonition, _admonition_replacement)
+register_node_replacement(sd_tab_input, lambda _: [])
+register_node_replacement(sd_tab_label, _tab_label_replacement)
+register_node_replacement(nodes.raw, _raw_html_replacement)
 
 
 def _extract_description(
@@ -614,6 +926,12 @@ def _page_url(base_url: str, docname: str) -> str:
     return f"{docname}.html"
 
 
+def _file_url(base_url: str, name: str) -> str:
+    if base_url:
+        return f"{base_url}/{name}"
+    return name
+
+
 def _llms_files_note() -> str:
     """A note that each ROCm project publishes its own llms files.
 
@@ -637,6 +955,7 @@ def _assemble_index(
     entries: list[_TocEntry],
     titles: dict[str, str],
     descriptions: dict[str, str],
+    sharded: bool = False,
 ) -> str:
     project_title = app.config.project or "Documentation"
     lines = [f"# {project_title}", ""]
@@ -669,23 +988,313 @@ def _assemble_index(
             bullet += f": {description}"
         lines.append(bullet)
 
+    if sharded:
+        lines += [
+            "",
+            "## Full text",
+            "",
+            f"- [{FULL_FILENAME}]({_file_url(base_url, FULL_FILENAME)}): "
+            "All pages in one file",
+            f"- [{SHARD_MANIFEST_FILENAME}]"
+            f"({_file_url(base_url, SHARD_MANIFEST_FILENAME)}): "
+            "The pages split into smaller files by section",
+        ]
+
     return "\n".join(lines) + "\n"
 
 
-def _assemble_full(
-    index: str,
+def estimate_tokens(text: str) -> int:
+    """Estimate the tokens of *text* from its length in characters.
+
+    This is the default of ``rocm_docs_llms_tokenizer``. It assumes
+    :data:`CHARS_PER_TOKEN` characters per token, which is fast but only
+    approximate, in particular for code and tables.
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _tokenizer(app: Sphinx) -> Callable[[str], int]:
+    tokenizer: Callable[[str], int] | None = app.config.rocm_docs_llms_tokenizer
+    return tokenizer or estimate_tokens
+
+
+def _apply_token_budget(
+    app: Sphinx, pages: dict[str, _RenderedPage], index_tokens: int
+) -> list[str]:
+    """Move the largest pages to index-only until the full text fits the budget.
+
+    The budget is ``rocm_docs_llms_token_budget``, for the index and all
+    inlined pages together. Returns the docnames of the moved pages, which
+    are still listed in the index.
+    """
+    budget: int = app.config.rocm_docs_llms_token_budget
+    if budget <= 0:
+        return []
+    inlined = sorted(
+        (
+            (docname, page)
+            for docname, page in pages.items()
+            if page.cache_key is not None
+        ),
+        key=lambda item: (-item[1].tokens, item[0]),
+    )
+    total = index_tokens + sum(page.tokens for _, page in inlined)
+    moved: list[str] = []
+    for docname, page in inlined:
+        if total <= budget:
+            break
+        page.cache_key = None
+        total -= page.tokens
+        moved.append(docname)
+    if moved:
+        logger.info(
+            "llms: moved %d pages to index-only to fit the token budget of "
+            "%d: %s",
+            len(moved),
+            budget,
+            ", ".join(moved),
+        )
+    if total > budget:
+        logger.warning(
+            "llms: the index alone has about %d tokens, more than the "
+            "rocm_docs_llms_token_budget of %d",
+            index_tokens,
+            budget,
+            type="rocm_docs",
+            subtype="llms",
+        )
+    return moved
+
+
+def _report_tokens(
+    app: Sphinx,
+    tokens: dict[str, int],
+    index_tokens: int,
+    index_only: list[str],
+) -> None:
+    """Log the largest pages and write the token report.
+
+    *tokens* holds the estimated tokens of each rendered page, including the
+    pages in *index_only*, which were moved out of the full text to fit the
+    token budget.
+    """
+    moved = set(index_only)
+    largest = sorted(tokens.items(), key=lambda item: (-item[1], item[0]))
+    inlined = sum(count for docname, count in largest if docname not in moved)
+    full = index_tokens + inlined
+    logger.info(
+        "llms: %s has about %d tokens, %d of them in the %s index",
+        FULL_FILENAME,
+        full,
+        index_tokens,
+        INDEX_FILENAME,
+    )
+    for docname, count in largest[:_TOKEN_REPORT_TOP_N]:
+        logger.info(
+            "  %s: %d tokens (%.1f%%)%s",
+            docname,
+            count,
+            100 * count / max(index_tokens + sum(tokens.values()), 1),
+            " [index-only]" if docname in moved else "",
+        )
+
+    tokenizer = _tokenizer(app)
+    report: dict[str, Any] = {
+        "tokenizer": getattr(tokenizer, "__qualname__", repr(tokenizer)),
+        "budget": app.config.rocm_docs_llms_token_budget,
+        "totals": {
+            "full": full,
+            "index": index_tokens,
+            "pages": inlined,
+            "index_only": sum(tokens[docname] for docname in moved),
+        },
+        "pages": [
+            {"page": docname, "tokens": count, "index_only": docname in moved}
+            for docname, count in largest
+        ],
+    }
+    report_path = Path(app.doctreedir, TOKEN_REPORT_FILENAME)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    output.write_if_changed(report_path, json.dumps(report, indent=1))
+
+
+def _page_separator(base_url: str, docname: str) -> str:
+    # The rendered body already begins with the page's own title heading, so
+    # only a separator and source attribution are prepended to it.
+    return f"\n\n---\n\nSource: {_page_url(base_url, docname)}\n\n"
+
+
+def _write_pages(
+    file: TextIO,
     entries: list[_TocEntry],
     base_url: str,
-    rendered: dict[str, str],
-) -> str:
-    parts = [index.rstrip()]
+    pages: dict[str, _RenderedPage],
+    cache: _MarkdownCache,
+) -> None:
+    """Write the full text of the pages of *entries*, in TOC order."""
     for entry in entries:
         docname = entry.docname
-        if docname is None or docname not in rendered:
+        if docname is None:
             continue
-        url = _page_url(base_url, docname)
-        body = rendered[docname]
-        # The rendered body already begins with the page's own title heading,
-        # so only a separator and source attribution are prepended here.
-        parts.append(f"---\n\nSource: {url}\n\n{body}")
-    return "\n\n".join(parts) + "\n"
+        key = pages[docname].cache_key
+        if key is None:
+            continue
+        file.write(_page_separator(base_url, docname))
+        with cache.file(key).open(encoding="utf-8", newline="") as body:
+            shutil.copyfileobj(body, file)
+
+
+def _sharded(app: Sphinx) -> bool:
+    return bool(
+        app.config.rocm_docs_llms_full_shard_tokens > 0
+        or app.config.rocm_docs_llms_full_shard_size > 0
+    )
+
+
+def _shard_entries(
+    app: Sphinx,
+    base_url: str,
+    entries: list[_TocEntry],
+    pages: dict[str, _RenderedPage],
+    cache: _MarkdownCache,
+) -> list[list[_TocEntry]]:
+    """Split *entries* into the shards of the full text, if enabled.
+
+    A token limit takes precedence over a size limit.
+    """
+    shard_tokens: int = app.config.rocm_docs_llms_full_shard_tokens
+    if shard_tokens > 0:
+        tokens = {
+            docname: page.tokens
+            for docname, page in pages.items()
+            if page.cache_key is not None
+        }
+        return _split_shards(entries, tokens, shard_tokens)
+    shard_size: int = app.config.rocm_docs_llms_full_shard_size
+    if shard_size > 0:
+        sizes = {
+            docname: len(_page_separator(base_url, docname).encode("utf-8"))
+            + cache.file(page.cache_key).stat().st_size
+            for docname, page in pages.items()
+            if page.cache_key is not None
+        }
+        return _split_shards(entries, sizes, shard_size)
+    return []
+
+
+def _split_sections(
+    entries: list[_TocEntry], sizes: dict[str, int], limit: int
+) -> list[list[_TocEntry]]:
+    """Split *entries* into TOC sections of at most *limit* bytes or tokens.
+
+    *entries* starts with the page heading a section. If the section is too
+    large, its subsections, the runs of entries starting at the next TOC
+    level, are split in turn, and the heading page is kept with the first of
+    them if they fit together. A single page larger than *limit* is returned
+    as a section of its own.
+    """
+    if _size(entries, sizes) <= limit or len(entries) == 1:
+        return [entries]
+    head, rest = entries[0], entries[1:]
+    depth = min(entry.depth for entry in rest)
+    subsections: list[list[_TocEntry]] = []
+    for entry in rest:
+        if entry.depth == depth or not subsections:
+            subsections.append([])
+        subsections[-1].append(entry)
+    sections: list[list[_TocEntry]] = []
+    for subsection in subsections:
+        sections += _split_sections(subsection, sizes, limit)
+    if _size([head, *sections[0]], sizes) <= limit:
+        sections[0].insert(0, head)
+    else:
+        sections.insert(0, [head])
+    return sections
+
+
+def _size(entries: list[_TocEntry], sizes: dict[str, int]) -> int:
+    return sum(sizes.get(entry.docname or "", 0) for entry in entries)
+
+
+def _split_shards(
+    entries: list[_TocEntry], sizes: dict[str, int], limit: int
+) -> list[list[_TocEntry]]:
+    """Group the TOC sections of *entries* into shards of about *limit*.
+
+    *sizes* holds the bytes or tokens each inlined page adds to the full
+    text, in the unit of *limit*. Sections
+    are kept in TOC order and only split if they do not fit in a shard of
+    their own, so a shard exceeds *limit* only if a single page does.
+    """
+    shards: list[list[_TocEntry]] = []
+    shard_size = 0
+    for section in _split_sections(entries, sizes, limit):
+        size = _size(section, sizes)
+        if not shards or (size and shard_size and shard_size + size > limit):
+            shards.append([])
+            shard_size = 0
+        shards[-1] += section
+        shard_size += size
+    return shards
+
+
+def _shard_paths(out_dir: Path) -> list[Path]:
+    """Return the shards in *out_dir*, with any number of digits."""
+    prefix, suffix = SHARD_FILENAME.split("{index:03d}")
+    return [
+        path
+        for path in out_dir.glob(f"{prefix}*{suffix}")
+        if path.name[len(prefix) : -len(suffix)].isdigit()
+    ]
+
+
+def _write_shards(
+    app: Sphinx,
+    base_url: str,
+    shards: list[list[_TocEntry]],
+    titles: dict[str, str],
+    pages: dict[str, _RenderedPage],
+    cache: _MarkdownCache,
+) -> None:
+    """Write the shards of the full text and the manifest listing them.
+
+    Shards and a manifest of a previous build that are no longer written
+    are removed.
+    """
+    out_dir = Path(app.outdir)
+    names = [
+        SHARD_FILENAME.format(index=index)
+        for index in range(1, len(shards) + 1)
+    ]
+    for path in _shard_paths(out_dir):
+        if path.name not in names:
+            path.unlink()
+    if not shards:
+        (out_dir / SHARD_MANIFEST_FILENAME).unlink(missing_ok=True)
+        return
+
+    project_title = app.config.project or "Documentation"
+    manifest = [
+        f"# {project_title}: {FULL_FILENAME} in parts",
+        "",
+        f"> The pages of [{FULL_FILENAME}]"
+        f"({_file_url(base_url, FULL_FILENAME)}), split into smaller files "
+        "along the sections of the table of contents.",
+    ]
+    for number, (name, shard) in enumerate(zip(names, shards), start=1):
+        with output.replace_if_changed(out_dir / name) as file:
+            file.write(f"# {project_title} (part {number} of {len(shards)})")
+            _write_pages(file, shard, base_url, pages, cache)
+            file.write("\n")
+        manifest += ["", f"## [{name}]({_file_url(base_url, name)})", ""]
+        manifest += [
+            f"- [{titles[entry.docname]}]"
+            f"({_page_url(base_url, entry.docname)})"
+            for entry in shard
+            if entry.docname is not None
+            and pages[entry.docname].cache_key is not None
+        ]
+    output.write_if_changed(
+        out_dir / SHARD_MANIFEST_FILENAME, "\n".join(manifest) + "\n"
+    )
+    logger.info("Split %s into %d parts", FULL_FILENAME, len(shards))
@@ -0,0 +1,228 @@
+"""Prerender math to MathML at build time.
+
+When enabled via ``rocm_docs_math_prerender = True`` in ``conf.py``, inline and
+display math is converted to static MathML while Sphinx resolves each doctree,
+and an HTML math renderer writes that MathML into the page. Browsers render
+MathML natively, so pages whose formulas all convert no longer load MathJax.
+
+The conversion uses the pure-Python ``latex2mathml`` package (installed via the
+``math`` extra). Formulas it cannot convert keep the MathJax markup, and MathJax
+is loaded on exactly the pages that contain such a formula. Conversions are
+cached by a hash of the TeX source in the doctree directory, so rebuilds only
+convert new or changed formulas.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import hashlib
+import importlib.metadata
+import json
+import re
+from pathlib import Path
+
+import sphinx.util.logging
+from docutils import nodes
+from pydata_sphinx_theme.utils import (  # type: ignore[import-untyped]
+    config_provided_by_user,
+)
+from sphinx.application import Sphinx
+from sphinx.ext import mathjax
+from sphinx.locale import _
+from sphinx.util.math import get_node_equation_number
+
+if TYPE_CHECKING:
+    from sphinx.writers.html5 import HTML5Translator
+
+logger = sphinx.util.logging.getLogger(__name__)
+
+RENDERER_NAME = "rocm_docs_mathml"
+CACHE_FILENAME = "rocm_docs_mathml.json"
+
+# Doctree node attribute carrying the prerendered MathML from the resolve phase
+# to the HTML writer (which may run in a forked worker process).
+_MATHML_ATTR = "rocm_docs_mathml"
+
+# latex2mathml keeps commands it does not know as literal identifiers (e.g.
+# ``<mi>\foo</mi>``) instead of failing. Such output is left to MathJax.
+_UNKNOWN_COMMAND = re.compile(r">\\[A-Za-z]+<")
+
+
+def _convert(latex: str, display: str) -> str | None:
+    """Convert TeX to MathML, or return ``None`` if it cannot be converted."""
+    from latex2mathml.converter import convert
+
+    try:
+        mathml = convert(latex, display=display)
+    except Exception:  # latex2mathml raises plain Exception subclasses
+        return None
+    if _UNKNOWN_COMMAND.search(mathml):
+        return None
+    return mathml
+
+
+class _MathMLCache:
+    """MathML conversions keyed by a hash of the display mode and TeX source.
+
+    Failed conversions are cached as ``None`` so they are not retried. The cache
+    is discarded when the installed ``latex2mathml`` version changes.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.version = importlib.metadata.version("latex2mathml")
+        self.entries: dict[str, str | None] = {}
+        self.dirty = False
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == self.version:
+            self.entries = data.get("entries", {})
+
+    def convert(self, latex: str, display: str) -> str | None:
+        key = hashlib.sha256(f"{display}\0{latex}".encode()).hexdigest()
+        try:
+            return self.entries[key]
+        except KeyError:
+            pass
+        mathml = self.entries[key] = _convert(latex, display)
+        self.dirty = True
+        return mathml
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": self.version, "entries": self.entries}
+        self.path.write_text(json.dumps(data), encoding="utf-8")
+        self.dirty = False
+
+
+class _MathMLPrerenderer:
+    """Event handlers converting math nodes and loading MathJax on demand."""
+
+    def __init__(self) -> None:
+        self.cache: _MathMLCache | None = None
+        # Pages with at least one formula that is left to MathJax.
+        self.mathjax_pages: set[str] = set()
+
+    def _active(self, app: Sphinx) -> bool:
+        return (
+            getattr(app.builder, "format", "") == "html"
+            and getattr(app.builder, "math_renderer_name", None)
+            == RENDERER_NAME
+        )
+
+    def builder_inited(self, app: Sphinx) -> None:
+        if self._active(app):
+            self.cache = _MathMLCache(Path(app.doctreedir, CACHE_FILENAME))
+
+    def doctree_resolved(
+        self, app: Sphinx, doctree: nodes.document, docname: str
+    ) -> None:
+        if self.cache is None or not self._active(app):
+            return
+        needs_mathjax = False
+        for node in doctree.findall(nodes.math):
+            mathml = self.cache.convert(node.astext(), "inline")
+            node[_MATHML_ATTR] = mathml
+            needs_mathjax |= mathml is None
+        for block in doctree.findall(nodes.math_block):
+            if block.get("no-wrap", block.get("nowrap", False)):
+                needs_mathjax = True
+                continue
+            mathml = self._convert_block(block.astext())
+            block[_MATHML_ATTR] = mathml
+            needs_mathjax |= mathml is None
+        if needs_mathjax:
+            self.mathjax_pages.add(docname)
+        else:
+            self.mathjax_pages.discard(docname)
+
+    def _convert_block(self, latex: str) -> str | None:
+        """Convert display math, mirroring how MathJax splits equations."""
+        assert self.cache is not None
+        rendered = []
+        for part in (prt for prt in latex.split("\n\n") if prt.strip()):
+            if r"\\" in part:
+                part = r"\begin{split}" + part + r"\end{split}"
+            mathml = self.cache.convert(part, "block")
+            if mathml is None:
+                return None
+            rendered.append(mathml)
+        return "".join(rendered)
+
+    def html_page_context(
+        self,
+        app: Sphinx,
+        pagename: str,
+        templatename: str,
+        context: dict[str, Any],
+        doctree: nodes.document | None,
+    ) -> None:
+        """Load MathJax only on pages that still contain TeX markup."""
+        if pagename not in self.mathjax_pages:
+            return
+        # install_mathjax only acts when MathJax is the selected renderer.
+        app.config.html_math_renderer = "mathjax"
+        try:
+            mathjax.install_mathjax(
+                app, pagename, templatename, context, doctree
+            )
+        finally:
+            app.config.html_math_renderer = RENDERER_NAME
+
+    def build_finished(self, _: Sphinx, exception: Exception | None) -> None:
+        if self.cache is not None and exception is None:
+            self.cache.save()
+
+
+def _visit_math(self: HTML5Translator, node: nodes.math) -> None:
+    mathml = node.get(_MATHML_ATTR)
+    if mathml is None:
+        mathjax.html_visit_math(self, node)
+    self.body.append(
+        self.starttag(node, "span", "", CLASS="math notranslate nohighlight")
+    )
+    self.body.append(mathml + "</span>")
+    raise nodes.SkipNode
+
+
+def _visit_displaymath(self: HTML5Translator, node: nodes.math_block) -> None:
+    mathml = node.get(_MATHML_ATTR)
+    if mathml is None:
+        mathjax.html_visit_displaymath(self, node)
+    self.body.append(
+        self.starttag(node, "div", CLASS="math notranslate nohighlight")
+    )
+    if node["number"]:
+        number = get_node_equation_number(self, node)
+        self.body.append(f'<span class="eqno">({number})')
+        self.add_permalink_ref(node, _("Link to this equation"))
+        self.body.append("</span>")
+    self.body.append(mathml)
+    self.body.append("</div>\n")
+    raise nodes.SkipNode
+
+
+def install(app: Sphinx) -> None:
+    """Register the MathML renderer and select it for HTML builds.
+
+    Called at ``config-inited`` when ``rocm_docs_math_prerender`` is enabled.
+    A renderer chosen explicitly via ``html_math_renderer`` is left in place.
+    """
+    app.add_html_math_renderer(
+        RENDERER_NAME,
+        inline_renderers=(_visit_math, None),
+        block_renderers=(_visit_displaymath, None),
+    )
+    if not config_provided_by_user(app, "html_math_renderer"):
+        app.config.html_math_renderer = RENDERER_NAME
+
+    prerenderer = _MathMLPrerenderer()
+    app.connect("builder-inited", prerenderer.builder_inited)
+    app.connect("doctree-resolved", prerenderer.doctree_resolved)
+    app.connect("html-page-context", prerenderer.html_page_context)
+    app.connect("build-finished", prerenderer.build_finished)
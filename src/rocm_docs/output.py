@@ -0,0 +1,366 @@
+"""Keep unchanged output files untouched and describe them for deployment.
+
+Sphinx and the rocm_docs build-finished steps write their outputs on every
+build, even when the bytes are identical, which resets the modification time
+of every file. Deploy tools that compare modification times (rsync, S3 sync)
+then transfer the whole site again.
+
+The writers of rocm_docs use :func:`write_if_changed`, which leaves a file
+alone when it already has the new content. For the files written by Sphinx
+and other extensions, ``rocm_docs_skip_unchanged_writes = True`` in
+``conf.py`` records the SHA-256 hash of every output file in the doctree
+directory. At the end of the next build, files that were rewritten with the
+same content get their previous modification time back, unless a page would
+then be older than its source, which would make Sphinx rebuild it again.
+
+With ``rocm_docs_deploy_manifest = True``, the size, hash and producing stage
+of every output file are written to ``deploy-manifest.json`` in the output
+directory. :mod:`rocm_docs.deploy` compares two manifests.
+
+Files that rocm_docs copies are placed with :func:`place_file`, which shares
+the storage of the source file where the filesystem allows it.
+"""
+
+from __future__ import annotations
+
+from typing import Any, TextIO
+
+import collections
+import contextlib
+import filecmp
+import hashlib
+import json
+import os
+import shutil
+import sys
+import weakref
+from collections.abc import Callable, Iterable, Iterator, Mapping, Set
+from pathlib import Path
+
+import sphinx.util.logging
+from sphinx.application import Sphinx
+
+logger = sphinx.util.logging.getLogger(__name__)
+
+# File name of the recorded hashes of a builder's output, stored in the
+# doctree directory.
+HASHES_FILENAME = "rocm_docs_output_hashes-{builder}.json"
+
+# File name of the deploy manifest, written to the output directory.
+MANIFEST_FILENAME = "deploy-manifest.json"
+MANIFEST_VERSION = 1
+
+# Stage of the output files that no registered stage claims.
+DEFAULT_STAGE = "sphinx"
+
+_CHUNK_SIZE = 1 << 20
+
+# ioctl request cloning a file on Linux, see ioctl_ficlone(2).
+_FICLONE = 0x40049409
+
+_STAGES: weakref.WeakKeyDictionary[
+    Sphinx, list[tuple[str, Callable[[Sphinx], Iterable[str]]]]
+] = weakref.WeakKeyDictionary()
+
+
+def write_if_changed(path: Path, data: str | bytes) -> bool:
+    """Write *data* to *path* unless the file already holds exactly *data*.
+
+    Text is encoded as UTF-8. Returns whether the file was written.
+    """
+    content = data.encode("utf-8") if isinstance(data, str) else data
+    try:
+        if path.stat().st_size == len(content) and path.read_bytes() == content:
+            return False
+    except OSError:
+        pass
+    path.write_bytes(content)
+    return True
+
+
+@contextlib.contextmanager
+def replace_if_changed(path: Path) -> Iterator[TextIO]:
+    """Write the text file *path* through a temporary file.
+
+    The text written to the yielded file replaces *path* atomically when the
+    block exits, unless *path* already holds the same content, in which case
+    it is left untouched. If the block raises, *path* is not changed. The
+    content never has to be held in memory as a whole.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("w", encoding="utf-8", newline="") as file:
+            yield file
+        if path.is_file() and filecmp.cmp(tmp, path, shallow=False):
+            tmp.unlink()
+        else:
+            os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    """Clone *src* to *dst* sharing the data blocks, if the filesystem can."""
+    if sys.platform == "win32":
+        return False
+    import fcntl
+
+    try:
+        with src.open("rb") as src_file, dst.open("wb") as dst_file:
+            fcntl.ioctl(dst_file.fileno(), _FICLONE, src_file.fileno())
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+    return True
+
+
+def place_file(src: Path, dst: Path, *, hardlink: bool = False) -> str:
+    """Make *dst* a file with the content of *src*, sharing storage if possible.
+
+    The file is cloned with a reflink where the filesystem supports it
+    (Btrfs, XFS), which behaves like a copy. With *hardlink*, a hard link is
+    tried next; the caller must then never modify *dst* in place, as that
+    would change *src* too. Otherwise the file is copied. An existing *dst*
+    with the same content is left untouched, and a changed one is replaced
+    rather than written to, so hard links placed before are not written
+    through.
+
+    Returns how the file was placed: ``"unchanged"``, ``"reflink"``,
+    ``"hardlink"`` or ``"copy"``.
+    """
+    try:
+        if dst.samefile(src) or filecmp.cmp(src, dst, shallow=False):
+            return "unchanged"
+    except OSError:
+        pass
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.tmp")
+    tmp.unlink(missing_ok=True)
+    if _reflink(src, tmp):
+        method = "reflink"
+        shutil.copymode(src, tmp)
+    else:
+        method = "copy"
+        if hardlink:
+            try:
+                os.link(src, tmp)
+                method = "hardlink"
+            except OSError:
+                pass
+        if method == "copy":
+            shutil.copyfile(src, tmp)
+            shutil.copymode(src, tmp)
+    os.replace(tmp, dst)
+    return method
+
+
+def place_tree(
+    src: Path, dst: Path, *, hardlink: bool = False
+) -> collections.Counter[str]:
+    """Place all files of the folder *src* into *dst* with :func:`place_file`.
+
+    Files in *dst* that are not in *src* are kept. Returns how many files
+    were placed with each method.
+    """
+    methods: collections.Counter[str] = collections.Counter()
+    for path in sorted(src.rglob("*")):
+        if path.is_file():
+            target = dst / path.relative_to(src)
+            methods[place_file(path, target, hardlink=hardlink)] += 1
+    return methods
+
+
+def file_digest(path: Path) -> str:
+    """Return the hex SHA-256 digest of the file at *path*."""
+    digest = hashlib.sha256()
+    with path.open("rb") as file:
+        while chunk := file.read(_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_hashes(path: Path) -> dict[str, list[object]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def hash_outputs(
+    outdir: Path,
+    hashes_path: Path,
+    *,
+    restore_mtimes: bool = False,
+    exclude: Set[str] = frozenset(),
+    min_mtimes: Mapping[str, int] | None = None,
+) -> tuple[dict[str, list[Any]], int]:
+    """Hash all files in *outdir*, reusing the hashes of unchanged files.
+
+    *hashes_path* stores ``[digest, size, mtime_ns]`` for each file, relative
+    to *outdir*, as of the previous call. Files whose size and modification
+    time still match their record are not hashed again. With
+    *restore_mtimes*, files that were rewritten with the content of their
+    record get their recorded modification time back, but not one older than
+    given for the file in *min_mtimes*, in nanoseconds. Files with several
+    hard links are left alone, as their modification time is shared with
+    the other links, like the sources of files placed with
+    :func:`place_file`.
+
+    Returns the records of all files and the number of files whose
+    modification time was restored. The directory holding *hashes_path* is
+    skipped if it is inside *outdir*, as are the paths in *exclude*.
+    """
+    try:
+        skipped = hashes_path.parent.resolve().relative_to(outdir.resolve())
+    except ValueError:
+        skipped = None
+    records = _load_hashes(hashes_path)
+    updated: dict[str, list[Any]] = {}
+    restored = 0
+    for path in sorted(outdir.rglob("*")):
+        if not path.is_file() or path.is_symlink():
+            continue
+        rel = path.relative_to(outdir)
+        if skipped is not None and rel.is_relative_to(skipped):
+            continue
+        name = rel.as_posix()
+        if name in exclude:
+            continue
+        stat = path.stat()
+        record = records.get(name)
+        if (
+            isinstance(record, list)
+            and len(record) == 3
+            and record[1:] == [stat.st_size, stat.st_mtime_ns]
+        ):
+            updated[name] = record
+            continue
+        digest = file_digest(path)
+        if (
+            restore_mtimes
+            and isinstance(record, list)
+            and len(record) == 3
+            and record[:2] == [digest, stat.st_size]
+            and isinstance(record[2], int)
+            and stat.st_nlink == 1
+        ):
+            mtime = max(record[2], (min_mtimes or {}).get(name, 0))
+            if mtime < stat.st_mtime_ns:
+                os.utime(path, ns=(stat.st_atime_ns, mtime))
+                updated[name] = [digest, stat.st_size, mtime]
+                restored += 1
+                continue
+        updated[name] = [digest, stat.st_size, stat.st_mtime_ns]
+
+    hashes_path.parent.mkdir(parents=True, exist_ok=True)
+    write_if_changed(hashes_path, json.dumps(updated, separators=(",", ":")))
+    return updated, restored
+
+
+def register_stage(
+    app: Sphinx, stage: str, outputs: Callable[[Sphinx], Iterable[str]]
+) -> None:
+    """Attribute output files of *app* to a build stage in the manifest.
+
+    *outputs* returns the files of the stage relative to the output
+    directory, or folders ending with ``/``. It is called once per build.
+    Files that no stage claims are attributed to ``sphinx``; if several
+    stages claim a file, the stage registered last wins.
+    """
+    _STAGES.setdefault(app, []).append((stage, outputs))
+
+
+def _stage_matcher(app: Sphinx) -> Callable[[str], str]:
+    files: dict[str, str] = {}
+    folders: list[tuple[str, str]] = []
+    for stage, outputs in _STAGES.get(app, []):
+        for output in outputs(app):
+            if output.endswith("/"):
+                folders.append((output, stage))
+            else:
+                files[output] = stage
+
+    def stage_of(name: str) -> str:
+        if name in files:
+            return files[name]
+        for folder, stage in reversed(folders):
+            if name.startswith(folder):
+                return stage
+        return DEFAULT_STAGE
+
+    return stage_of
+
+
+def write_manifest(app: Sphinx, records: dict[str, list[Any]]) -> None:
+    """Write the deploy manifest of the output files to the output directory."""
+    stage_of = _stage_matcher(app)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "files": {
+            name: {"size": size, "sha256": digest, "stage": stage_of(name)}
+            for name, (digest, size, _) in records.items()
+        },
+    }
+    write_if_changed(
+        Path(app.outdir, MANIFEST_FILENAME), json.dumps(manifest, indent=1)
+    )
+    logger.info("Wrote %s with %d files", MANIFEST_FILENAME, len(records))
+
+
+def _page_min_mtimes(app: Sphinx) -> dict[str, int]:
+    """Return the oldest modification time each page may have, by file name.
+
+    An HTML builder rebuilds a page whose source or newest template is newer
+    than the page, so a restored modification time must not be older.
+    """
+    if not hasattr(app.builder, "get_outfilename"):
+        return {}
+    templates = getattr(app.builder, "templates", None)
+    template_mtime = 0
+    if templates is not None:
+        template_mtime = int(templates.newest_template_mtime() * 10**9)
+    outdir = Path(app.outdir)
+    min_mtimes: dict[str, int] = {}
+    for docname in app.env.found_docs:
+        try:
+            source_mtime = os.stat(app.env.doc2path(docname)).st_mtime_ns
+            name = Path(app.builder.get_outfilename(docname)).relative_to(
+                outdir
+            )
+        except (OSError, ValueError):
+            continue
+        min_mtimes[name.as_posix()] = max(source_mtime, template_mtime)
+    return min_mtimes
+
+
+def finish_outputs(app: Sphinx, exception: Exception | None) -> None:
+    """Keep unchanged output files untouched and write the deploy manifest.
+
+    Connected to the ``build-finished`` event with a late priority, so that
+    the files written by other build-finished handlers are covered too.
+    """
+    if exception is not None:
+        return
+    restore_mtimes = bool(app.config.rocm_docs_skip_unchanged_writes)
+    manifest = bool(app.config.rocm_docs_deploy_manifest)
+    if not restore_mtimes and not manifest:
+        return
+    hashes_path = Path(
+        app.doctreedir, HASHES_FILENAME.format(builder=app.builder.name)
+    )
+    records, restored = hash_outputs(
+        Path(app.outdir),
+        hashes_path,
+        restore_mtimes=restore_mtimes,
+        exclude={MANIFEST_FILENAME},
+        min_mtimes=_page_min_mtimes(app) if restore_mtimes else None,
+    )
+    if restore_mtimes:
+        logger.info(
+            "Restored the modification time of %d unchanged output files",
+            restored,
+        )
+    if manifest:
+        write_manifest(app, records)
@@ -0,0 +1,297 @@
+"""Report the weight of each HTML output page.
+
+When enabled via ``rocm_docs_page_weight_report = True`` in ``conf.py``, every
+HTML page in the output directory is measured after the build:
+
+* ``html`` -- the size of the HTML file itself.
+* ``inline`` -- bytes of inline ``<svg>`` elements and inline ``<script>``
+  bodies embedded in the page.
+* ``sidebar`` -- bytes of the primary (navigation) sidebar markup.
+* ``assets`` -- the total size of the local files the page references directly
+  (stylesheets, scripts, images, preloads); each file is counted once per page.
+* ``total`` -- ``html`` plus ``assets``.
+
+The pages are measured by a :mod:`rocm_docs.postprocess` transform. The
+heaviest pages are logged and the full report is written as JSON to the
+doctree directory. Budgets can be configured per theme flavor with
+``rocm_docs_page_weight_budgets``; pages over budget produce a warning.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import json
+import posixpath
+from dataclasses import asdict, dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+import sphinx.util.logging
+from pydata_sphinx_theme.utils import (  # type: ignore[import-untyped]
+    get_theme_options_dict,
+)
+from sphinx.application import Sphinx
+
+from rocm_docs import postprocess
+
+logger = sphinx.util.logging.getLogger(__name__)
+
+REPORT_FILENAME = "page-weight.json"
+
+METRICS: tuple[str, ...] = ("html", "inline", "sidebar", "assets", "total")
+
+# Budgets under this key apply to flavors without budgets of their own.
+DEFAULT_BUDGET_KEY = "*"
+
+# Attributes referencing a resource that the browser loads with the page.
+_RESOURCE_ATTRS: dict[str, tuple[str, ...]] = {
+    "img": ("src",),
+    "script": ("src",),
+    "source": ("src",),
+    "video": ("src", "poster"),
+    "audio": ("src",),
+    "input": ("src",),
+}
+_RESOURCE_LINK_RELS = frozenset(
+    {"stylesheet", "preload", "modulepreload", "icon", "shortcut"}
+)
+
+
+@dataclass
+class PageWeight:
+    """The measured weight of one output page, in bytes."""
+
+    page: str
+    html: int = 0
+    inline: int = 0
+    sidebar: int = 0
+    assets: int = 0
+
+    @property
+    def total(self) -> int:
+        """The HTML bytes plus the bytes of the referenced local assets."""
+        return self.html + self.assets
+
+    def metric(self, name: str) -> int:
+        """Return the value of the metric called *name*."""
+        return int(getattr(self, name))
+
+
+class _PageWeightParser(HTMLParser):
+    """Measure inline SVG/script and sidebar markup and collect resources.
+
+    Offsets reported by :meth:`HTMLParser.getpos` are (line, column) pairs;
+    they are converted to character offsets to slice out the measured markup.
+    """
+
+    def __init__(self, html: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self._html = html
+        self._line_starts = [0]
+        for index, char in enumerate(html):
+            if char == "\n":
+                self._line_starts.append(index + 1)
+        self.inline = 0
+        self.sidebar = 0
+        self.resources: set[str] = set()
+        self._svg_depth = 0
+        self._svg_start = 0
+        self._in_inline_script = False
+        self._sidebar_depth = 0
+        self._sidebar_start = 0
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_starts[line - 1] + column
+
+    def _bytes(self, start: int, end: int) -> int:
+        return len(self._html[start:end].encode("utf-8"))
+
+    def handle_starttag(
+        self, tag: str, attrs: list[tuple[str, str | None]]
+    ) -> None:
+        attr = {k: (v or "") for k, v in attrs}
+        if tag == "svg":
+            if self._svg_depth == 0:
+                self._svg_start = self._offset()
+            self._svg_depth += 1
+        elif tag == "script" and not attr.get("src"):
+            self._in_inline_script = True
+        if tag == "div":
+            if self._sidebar_depth:
+                self._sidebar_depth += 1
+            elif "bd-sidebar-primary" in attr.get("class", "").split():
+                self._sidebar_depth = 1
+                self._sidebar_start = self._offset()
+
+        for name in _RESOURCE_ATTRS.get(tag, ()):
+            if attr.get(name):
+                self.resources.add(attr[name])
+        if tag == "link" and attr.get("href"):
+            rels = set(attr.get("rel", "").lower().split())
+            if rels & _RESOURCE_LINK_RELS:
+                self.resources.add(attr["href"])
+
+    def handle_startendtag(
+        self, tag: str, attrs: list[tuple[str, str | None]]
+    ) -> None:
+        # Self-closing tags never open an element that has to be closed.
+        if tag in ("svg", "div", "script"):
+            return
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        end = self._offset() + len(f"</{tag}>")
+        if tag == "svg" and self._svg_depth:
+            self._svg_depth -= 1
+            if self._svg_depth == 0:
+                self.inline += self._bytes(self._svg_start, end)
+        elif tag == "script":
+            self._in_inline_script = False
+        elif tag == "div" and self._sidebar_depth:
+            self._sidebar_depth -= 1
+            if self._sidebar_depth == 0:
+                self.sidebar += self._bytes(self._sidebar_start, end)
+
+    def handle_data(self, data: str) -> None:
+        if self._in_inline_script:
+            self.inline += len(data.encode("utf-8"))
+
+
+def _local_resource(outdir: Path, page: Path, url: str) -> Path | None:
+    """Resolve a resource URL of *page* to a file in *outdir*, if local."""
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    if parts.path.startswith("/"):
+        return None
+    page_dir = page.parent.relative_to(outdir).as_posix()
+    rel = posixpath.normpath(posixpath.join(page_dir, unquote(parts.path)))
+    if rel.startswith("../"):
+        return None
+    return outdir / rel
+
+
+def measure_page(
+    outdir: Path,
+    page: Path,
+    html: str,
+    asset_sizes: dict[Path, int],
+) -> PageWeight:
+    """Measure one page; *asset_sizes* caches file sizes across pages."""
+    parser = _PageWeightParser(html)
+    parser.feed(html)
+    parser.close()
+    assets = 0
+    for url in parser.resources:
+        path = _local_resource(outdir, page, url)
+        if path is None:
+            continue
+        if path not in asset_sizes:
+            try:
+                asset_sizes[path] = path.stat().st_size
+            except OSError:
+                asset_sizes[path] = 0
+        assets += asset_sizes[path]
+    return PageWeight(
+        page=page.relative_to(outdir).as_posix(),
+        html=len(html.encode("utf-8")),
+        inline=parser.inline,
+        sidebar=parser.sidebar,
+        assets=assets,
+    )
+
+
+def _budgets_for(app: Sphinx, flavor: str) -> dict[str, int]:
+    budgets: dict[str, dict[str, int]] = (
+        app.config.rocm_docs_page_weight_budgets
+    )
+    return budgets.get(flavor, budgets.get(DEFAULT_BUDGET_KEY, {}))
+
+
+def _check_budgets(
+    weights: list[PageWeight], budgets: dict[str, int], flavor: str
+) -> None:
+    unknown = set(budgets) - set(METRICS)
+    if unknown:
+        logger.warning(
+            "rocm_docs_page_weight_budgets: unknown metrics %s, expected "
+            "one of %s",
+            sorted(unknown),
+            list(METRICS),
+        )
+    for weight in weights:
+        over = [
+            f"{metric} {weight.metric(metric)} > {limit}"
+            for metric, limit in budgets.items()
+            if metric in METRICS and weight.metric(metric) > limit
+        ]
+        if over:
+            logger.warning(
+                "%s exceeds the page weight budget of flavor %r: %s",
+                weight.page,
+                flavor,
+                ", ".join(over),
+                type="rocm_docs",
+                subtype="page_weight",
+            )
+
+
+def _enabled(app: Sphinx) -> bool:
+    return bool(app.config.rocm_docs_page_weight_report)
+
+
+def page_weight_transform() -> postprocess.Transform:
+    """Return the post-processing transform measuring each page.
+
+    Asset sizes are cached for the pages processed by one worker.
+    """
+    asset_sizes: dict[Path, int] = {}
+
+    def process(page: postprocess.Page) -> PageWeight:
+        return measure_page(page.outdir, page.path, page.html, asset_sizes)
+
+    def finish(app: Sphinx, weights: list[PageWeight]) -> None:
+        asset_sizes.clear()
+        flavor = get_theme_options_dict(app).get("flavor", "rocm")
+        report_weights(app, weights, flavor)
+
+    return postprocess.Transform(
+        name="page_weight", process=process, enabled=_enabled, finish=finish
+    )
+
+
+def report_weights(app: Sphinx, weights: list[PageWeight], flavor: str) -> None:
+    """Log the heaviest pages, check budgets and write the JSON report."""
+    weights.sort(key=lambda weight: weight.total, reverse=True)
+    top_n: int = app.config.rocm_docs_page_weight_top_n
+    if weights:
+        logger.info("Heaviest pages (bytes):")
+        for weight in weights[:top_n]:
+            logger.info(
+                "  %s: total %d, html %d, inline %d, sidebar %d, assets %d",
+                weight.page,
+                weight.total,
+                weight.html,
+                weight.inline,
+                weight.sidebar,
+                weight.assets,
+            )
+    _check_budgets(weights, _budgets_for(app, flavor), flavor)
+
+    report: dict[str, Any] = {
+        "flavor": flavor,
+        "totals": {
+            metric: sum(weight.metric(metric) for weight in weights)
+            for metric in METRICS
+        },
+        "pages": [
+            {**asdict(weight), "total": weight.total} for weight in weights
+        ],
+    }
+    report_path = Path(app.doctreedir, REPORT_FILENAME)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=1), encoding="utf-8")
+    logger.info("Wrote page weight report for %d pages", len(weights))
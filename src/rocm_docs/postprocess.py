@@ -0,0 +1,225 @@
+"""Post-process the built HTML pages in a single pass.
+
+Features that need to inspect or rewrite finished pages register a
+:class:`Transform` with :func:`register_transform` instead of reading the
+output directory on their own. After a successful HTML build, each page is
+read once, parsed at most once, passed through all enabled transforms and
+written once if a transform changed it. Pages are split across processes
+when Sphinx runs with ``-j N``, and the time spent in each transform is
+reported.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import time
+import weakref
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import bs4
+import sphinx.util.logging
+from sphinx.application import Sphinx
+from sphinx.util.parallel import ParallelTasks, parallel_available
+
+from rocm_docs import output
+
+logger = sphinx.util.logging.getLogger(__name__)
+
+
+class Page:
+    """An HTML output page, as text and, on demand, as a parsed tree.
+
+    The tree is parsed once, on first access, and shared by all transforms.
+    Transforms that modify the tree must call :meth:`tree_changed`; the page
+    is then serialized once, when its text is needed again or written.
+    """
+
+    def __init__(self, outdir: Path, path: Path) -> None:
+        """Read the page at *path* in the output directory *outdir*."""
+        self.outdir = outdir
+        self.path = path
+        self.name = path.relative_to(outdir).as_posix()
+        self._html = path.read_text(encoding="utf-8")
+        self._tree: bs4.BeautifulSoup | None = None
+        self._tree_dirty = False
+        self.changed = False
+
+    @property
+    def html(self) -> str:
+        """The markup of the page, including changes made to the tree."""
+        if self._tree is not None and self._tree_dirty:
+            self._html = str(self._tree)
+            self._tree_dirty = False
+        return self._html
+
+    @html.setter
+    def html(self, value: str) -> None:
+        if value != self.html:
+            self._html = value
+            self._tree = None
+            self.changed = True
+
+    @property
+    def tree(self) -> bs4.BeautifulSoup:
+        """The page parsed with BeautifulSoup's ``html.parser``."""
+        if self._tree is None:
+            self._tree = bs4.BeautifulSoup(self.html, "html.parser")
+        return self._tree
+
+    def tree_changed(self) -> None:
+        """Record that a transform modified :attr:`tree`."""
+        self._tree_dirty = True
+        self.changed = True
+
+
+@dataclass(frozen=True)
+class Transform:
+    """A step applied to every built HTML page.
+
+    ``process`` runs for each page, possibly in a worker process, and may
+    change the page or return a result. The results of all pages are passed
+    to ``finish`` in the main process, in page order. ``enabled`` decides
+    per build whether the transform runs at all.
+    """
+
+    name: str
+    process: Callable[[Page], Any]
+    enabled: Callable[[Sphinx], bool] = field(default=lambda _: True)
+    finish: Callable[[Sphinx, list[Any]], None] | None = None
+
+
+@dataclass
+class _ChunkResult:
+    results: dict[str, list[Any]] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+    errors: list[tuple[str, str]] = field(default_factory=list)
+
+    def add_time(self, name: str, start: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + (
+            time.perf_counter() - start
+        )
+
+
+class PostProcessor:
+    """The transforms registered for one Sphinx application."""
+
+    def __init__(self) -> None:
+        """Create a processor without transforms."""
+        self.transforms: list[Transform] = []
+
+    def build_finished(self, app: Sphinx, exception: Exception | None) -> None:
+        """Run the enabled transforms over all HTML pages of the output."""
+        if (
+            exception is not None
+            or getattr(app.builder, "format", "") != "html"
+        ):
+            return
+        transforms = [t for t in self.transforms if t.enabled(app)]
+        if not transforms:
+            return
+
+        outdir = Path(app.outdir)
+        pages = iter_pages(outdir)
+        nproc = app.parallel if parallel_available else 1
+        if nproc > 1 and len(pages) > 1:
+            size = -(-len(pages) // nproc)
+            chunks = [pages[i : i + size] for i in range(0, len(pages), size)]
+            chunk_results: dict[int, _ChunkResult] = {}
+            tasks = ParallelTasks(nproc)
+            for index, chunk in enumerate(chunks):
+
+                def on_result(
+                    _: object, result: _ChunkResult, index: int = index
+                ) -> None:
+                    chunk_results[index] = result
+
+                tasks.add_task(
+                    _process_chunk,
+                    (outdir, chunk, transforms),
+                    result_func=on_result,
+                )
+            tasks.join()
+            ordered = [chunk_results[i] for i in range(len(chunks))]
+        else:
+            ordered = [_process_chunk((outdir, pages, transforms))]
+
+        timings: dict[str, float] = {}
+        for chunk_result in ordered:
+            for name, seconds in chunk_result.timings.items():
+                timings[name] = timings.get(name, 0.0) + seconds
+            for page, error in chunk_result.errors:
+                logger.warning("Failed to post-process %s: %s", page, error)
+        logger.info(
+            "Post-processed %d pages: %s",
+            len(pages),
+            ", ".join(
+                f"{name} {seconds:.2f}s" for name, seconds in timings.items()
+            ),
+        )
+        for transform in transforms:
+            if transform.finish is not None:
+                results = [
+                    result
+                    for chunk_result in ordered
+                    for result in chunk_result.results.get(transform.name, [])
+                ]
+                transform.finish(app, results)
+
+
+def _process_chunk(
+    args: tuple[Path, list[Path], list[Transform]],
+) -> _ChunkResult:
+    """Read, transform and write a chunk of pages."""
+    outdir, paths, transforms = args
+    chunk_result = _ChunkResult(
+        results={transform.name: [] for transform in transforms}
+    )
+    for path in paths:
+        try:
+            start = time.perf_counter()
+            page = Page(outdir, path)
+            chunk_result.add_time("read", start)
+            for transform in transforms:
+                start = time.perf_counter()
+                result = transform.process(page)
+                chunk_result.add_time(transform.name, start)
+                if transform.finish is not None:
+                    chunk_result.results[transform.name].append(result)
+            if page.changed:
+                start = time.perf_counter()
+                output.write_if_changed(path, page.html)
+                chunk_result.add_time("write", start)
+        except (OSError, UnicodeError) as err:
+            chunk_result.errors.append(
+                (path.relative_to(outdir).as_posix(), str(err))
+            )
+    return chunk_result
+
+
+def iter_pages(outdir: Path) -> list[Path]:
+    """Return the HTML pages of an output directory, in a stable order."""
+    return sorted(
+        path
+        for path in outdir.rglob("*.html")
+        if path.relative_to(outdir).parts[0] != "_static"
+    )
+
+
+_PROCESSORS: weakref.WeakKeyDictionary[Sphinx, PostProcessor] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def register_transform(app: Sphinx, transform: Transform) -> None:
+    """Apply *transform* to the HTML pages of each build of *app*.
+
+    Transforms run in the order they are registered.
+    """
+    processor = _PROCESSORS.get(app)
+    if processor is None:
+        processor = _PROCESSORS[app] = PostProcessor()
+        app.connect("build-finished", processor.build_finished)
+    processor.transforms.append(transform)
@@ -1,5 +1,9 @@
 // Trigger the Read the Docs Addons Search modal when clicking on "Search docs" input from the topnav.
 document.querySelector(".search-button-field.search-button__button").addEventListener("focusin", () => {
+    // The local search index (rocm_docs_search_index) replaces the addon search.
+    if (document.documentElement.dataset.rocmDocsSearch === "local") {
+        return;
+    }
     const event = new CustomEvent("readthedocs-search-show");
     document.dispatchEvent(event);
  });
@@ -0,0 +1,171 @@
+"""Write a self-contained, prefix-sharded client-side search index.
+
+When enabled via ``rocm_docs_search_index = True`` in ``conf.py``, the search
+index that Sphinx's HTML builder collects from each resolved doctree is split
+into small gzip-compressed JSON shards, keyed by the first characters of each
+term, and written to ``_search/`` in the output directory along with a manifest
+of the pages. The ``rocm_search.js`` client loads the manifest on the first
+query and afterwards only the shards matching the query terms, so search works
+offline and on self-hosted mirrors, without the Read the Docs search service,
+and the data fetched per query does not grow with the size of the site.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import gzip
+import json
+import re
+from pathlib import Path
+
+import sphinx.util.logging
+from sphinx.application import Sphinx
+
+from rocm_docs import output
+
+logger = sphinx.util.logging.getLogger(__name__)
+
+INDEX_DIRNAME = "_search"
+MANIFEST_FILENAME = "manifest.json.gz"
+
+# Number of leading characters of a term that select its shard. Terms shorter
+# than this are stored in the shard named after the whole term.
+PREFIX_LENGTH = 2
+
+_CLIENT_STATIC_DIR = Path(__file__).parent / "data" / "search"
+
+# Separators of the components of API object names, matching the
+# ``/[.:]+/`` split in rocm_search.js.
+_NAME_SEPARATORS = re.compile(r"[.:]+")
+
+
+def shard_key(term: str) -> str:
+    """Return the key of the shard holding *term* (already lowercased)."""
+    return term[:PREFIX_LENGTH]
+
+
+def object_shard_key(fullname: str) -> str:
+    """Return the key of the shard holding the API object *fullname*.
+
+    Objects are sharded by their short name, the last component of the full
+    name when split at ``.`` and ``::``, as C++ names like
+    ``rocblas::gemm_ex`` are not split by Sphinx. ``rocm_search.js`` splits
+    the query the same way to find the shard.
+    """
+    parts = [part for part in _NAME_SEPARATORS.split(fullname) if part]
+    return shard_key((parts[-1] if parts else fullname).lower())
+
+
+def shard_filename(key: str) -> str:
+    """Return the file name of a shard; keys are hex-encoded to be path safe."""
+    return f"shard-{key.encode('utf-8').hex()}.json.gz"
+
+
+def _write_json_gz(path: Path, data: Any) -> None:
+    payload = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+    # A fixed mtime keeps the output byte-identical across builds.
+    output.write_if_changed(
+        path, gzip.compress(payload.encode("utf-8"), mtime=0)
+    )
+
+
+def _new_shard() -> dict[str, Any]:
+    return {"terms": {}, "titleterms": {}, "objects": []}
+
+
+def _shard_index(frozen: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """Split a frozen Sphinx search index into shards keyed by term prefix.
+
+    Document and title terms are stored as in ``searchindex.js`` (a document
+    index, or a list of them). API objects are flattened to
+    ``[doc, objtype, priority, anchor, fullname]`` with the anchor fully
+    expanded, and sharded with :func:`object_shard_key`.
+    """
+    shards: dict[str, dict[str, Any]] = {}
+    for kind in ("terms", "titleterms"):
+        for term, docs in frozen[kind].items():
+            shard = shards.setdefault(shard_key(term), _new_shard())
+            shard[kind][term] = docs
+
+    objnames = frozen["objnames"]
+    for prefix, entries in frozen["objects"].items():
+        for doc, typeindex, prio, anchor, name in entries:
+            fullname = f"{prefix}.{name}" if prefix else name
+            if anchor == "":
+                anchor = fullname
+            elif anchor == "-":
+                anchor = f"{objnames[typeindex][1]}-{fullname}"
+            shard = shards.setdefault(object_shard_key(fullname), _new_shard())
+            shard["objects"].append([doc, typeindex, prio, anchor, fullname])
+    return shards
+
+
+def add_search_client(app: Sphinx) -> None:
+    """Link the search client into every page when the index is enabled."""
+    if not app.config.rocm_docs_search_index:
+        return
+    if getattr(app.builder, "format", "") != "html":
+        return
+    app.config.html_static_path.append(str(_CLIENT_STATIC_DIR))
+    app.add_css_file("rocm_search.css")
+    app.add_js_file("rocm_search.js", loading_method="defer")
+
+
+def output_files(app: Sphinx) -> list[str]:
+    """Return the folder written by :func:`write_search_index`."""
+    if not app.config.rocm_docs_search_index:
+        return []
+    return [f"{INDEX_DIRNAME}/"]
+
+
+def write_search_index(app: Sphinx, exception: Exception | None) -> None:
+    """Write the sharded search index to ``_search/`` in the output directory.
+
+    Connected to the ``build-finished`` event. Does nothing if the build
+    failed, if the builder does not produce HTML, or if the HTML builder does
+    not collect a search index (``html_search`` disabled for the builder).
+    """
+    if exception is not None or not app.config.rocm_docs_search_index:
+        return
+    if getattr(app.builder, "format", "") != "html":
+        return
+    indexer = getattr(app.builder, "indexer", None)
+    if indexer is None:
+        logger.warning(
+            "rocm_docs_search_index is enabled but the %s builder does not "
+            "collect a search index; no index was written",
+            app.builder.name,
+        )
+        return
+
+    frozen = indexer.freeze()
+    shards = _shard_index(frozen)
+
+    out_dir = Path(app.outdir, INDEX_DIRNAME)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # Shards of terms that disappeared since the last build must not linger.
+    # Shards that still exist are only rewritten if their content changed.
+    filenames = {shard_filename(key) for key in shards}
+    for path in out_dir.iterdir():
+        if path.name not in filenames and path.name != MANIFEST_FILENAME:
+            path.unlink()
+
+    for key, shard in shards.items():
+        _write_json_gz(out_dir / shard_filename(key), shard)
+    manifest = {
+        "prefixLength": PREFIX_LENGTH,
+        "shards": sorted(shards),
+        "docurls": [
+            app.builder.get_target_uri(docname)
+            for docname in frozen["docnames"]
+        ],
+        "titles": frozen["titles"],
+        "objnames": {
+            index: name[2] for index, name in frozen["objnames"].items()
+        },
+    }
+    _write_json_gz(out_dir / MANIFEST_FILENAME, manifest)
+    logger.info(
+        "Wrote search index with %d shards to %s", len(shards), INDEX_DIRNAME
+    )
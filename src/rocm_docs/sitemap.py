@@ -0,0 +1,169 @@
+"""Write ``sitemap.xml`` with the date each page last changed in git.
+
+When enabled via ``rocm_docs_sitemap = True`` in ``conf.py``, every document
+of an HTML build is listed in ``sitemap.xml`` in the output directory, with
+its absolute URL and, as ``<lastmod>``, the date of the last commit that
+modified its source. The dates come from :mod:`rocm_docs.git_index` and share
+its cache with the article info dates, so a rebuild only reads the commits
+added since the previous build.
+
+Sitemaps are limited to 50,000 URLs. Larger sites are split into
+``sitemap-1.xml``, ``sitemap-2.xml`` and so on, and ``sitemap.xml`` becomes
+a sitemap index listing them.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import git.exc
+import git.repo
+import sphinx.util.logging
+from sphinx.application import Sphinx
+
+from rocm_docs import git_index, output
+
+logger = sphinx.util.logging.getLogger(__name__)
+
+SITEMAP_FILENAME = "sitemap.xml"
+SHARD_FILENAME = "sitemap-{index}.xml"
+
+# Most URLs a single sitemap may list, per the sitemaps.org protocol.
+MAX_URLS = 50_000
+
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+_XMLNS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def _base_url(app: Sphinx) -> str:
+    for candidate in (
+        app.config.html_baseurl,
+        os.environ.get("READTHEDOCS_CANONICAL_URL", ""),
+    ):
+        if candidate:
+            return str(candidate).rstrip("/") + "/"
+    return ""
+
+
+def _source_dates(app: Sphinx, docnames: list[str]) -> dict[str, str]:
+    """Look up the git dates of the sources of *docnames* in one batch."""
+    sources = {
+        docname: Path(app.srcdir, app.project.doc2path(docname, False))
+        for docname in docnames
+    }
+    try:
+        repo = git.repo.Repo(app.srcdir, search_parent_directories=True)
+    except (git.exc.InvalidGitRepositoryError, git.exc.NoSuchPathError):
+        logger.info("sitemap: not a git repository; <lastmod> is omitted")
+        return {}
+    dates = git_index.last_modified_dates(
+        repo,
+        sources.values(),
+        Path(app.doctreedir, git_index.CACHE_FILENAME),
+    )
+    return {
+        docname: dates[source]
+        for docname, source in sources.items()
+        if source in dates
+    }
+
+
+def _url_entry(url: str, lastmod: str | None) -> str:
+    entry = f"<url><loc>{escape(url)}</loc>"
+    if lastmod:
+        entry += f"<lastmod>{lastmod}</lastmod>"
+    return entry + "</url>\n"
+
+
+def render_sitemaps(
+    urls: list[tuple[str, str | None]], base_url: str
+) -> dict[str, str]:
+    """Render the sitemap files listing *urls*, by file name.
+
+    *urls* holds ``(url, lastmod)`` pairs. If there are more than
+    :data:`MAX_URLS`, the URLs are split into shards and ``sitemap.xml``
+    is an index of the shards, which are linked below *base_url*.
+    """
+    shards = [
+        urls[start : start + MAX_URLS]
+        for start in range(0, len(urls), MAX_URLS)
+    ] or [[]]
+    files: dict[str, str] = {}
+    for index, shard in enumerate(shards, start=1):
+        name = SITEMAP_FILENAME
+        if len(shards) > 1:
+            name = SHARD_FILENAME.format(index=index)
+        files[name] = "".join(
+            [
+                _XML_HEADER,
+                f"<urlset {_XMLNS}>\n",
+                *(_url_entry(url, lastmod) for url, lastmod in shard),
+                "</urlset>\n",
+            ]
+        )
+    if len(shards) > 1:
+        files[SITEMAP_FILENAME] = "".join(
+            [
+                _XML_HEADER,
+                f"<sitemapindex {_XMLNS}>\n",
+                *(
+                    f"<sitemap><loc>{escape(base_url + name)}</loc></sitemap>\n"
+                    for name in files
+                ),
+                "</sitemapindex>\n",
+            ]
+        )
+    return files
+
+
+def output_files(app: Sphinx) -> list[str]:
+    """Return the files written by :func:`write_sitemap`."""
+    if not app.config.rocm_docs_sitemap:
+        return []
+    count = -(-len(app.env.found_docs) // MAX_URLS)
+    if count <= 1:
+        return [SITEMAP_FILENAME]
+    return [SITEMAP_FILENAME] + [
+        SHARD_FILENAME.format(index=index) for index in range(1, count + 1)
+    ]
+
+
+def write_sitemap(app: Sphinx, exception: Exception | None) -> None:
+    """Write the sitemap of an HTML build to the output directory.
+
+    Connected to the ``build-finished`` event. Does nothing if the build
+    failed, if the builder does not produce HTML or if no base URL is known
+    (``html_baseurl`` or Read the Docs' canonical URL), as sitemaps must
+    list absolute URLs.
+    """
+    if exception is not None or not app.config.rocm_docs_sitemap:
+        return
+    if getattr(app.builder, "format", "") != "html":
+        return
+    base_url = _base_url(app)
+    if not base_url:
+        logger.warning(
+            "rocm_docs_sitemap is enabled but html_baseurl is not set; no "
+            "sitemap was written",
+            type="rocm_docs",
+            subtype="sitemap",
+        )
+        return
+
+    docnames = sorted(app.env.found_docs)
+    dates = _source_dates(app, docnames)
+    urls = [
+        (base_url + app.builder.get_target_uri(docname), dates.get(docname))
+        for docname in docnames
+    ]
+    outdir = Path(app.outdir)
+    files = render_sitemaps(urls, base_url)
+    # Shards of a previous build with more pages must not linger.
+    for path in outdir.glob(SHARD_FILENAME.format(index="*")):
+        if path.name not in files:
+            path.unlink()
+    for name, content in files.items():
+        output.write_if_changed(outdir / name, content)
+    logger.info("Wrote %s with %d pages", SITEMAP_FILENAME, len(urls))
@@ -2,7 +2,11 @@
 
 from typing import Any
 
+import functools
+import hashlib
+import importlib.metadata
 import time
+from fnmatch import fnmatch
 from pathlib import Path
 
 import requests
@@ -13,7 +17,7 @@ from pydata_sphinx_theme.utils import (  # type: ignore[import-untyped]
 )
 from sphinx.application import Sphinx
 
-from rocm_docs import util
+from rocm_docs import output, util
 
 logger = sphinx.util.logging.getLogger(__name__)
 
@@ -296,6 +300,241 @@ def _load_flavor_assets(app: Sphinx) -> None:
         app.add_js_file(js_file.name, loading_method="async")
 
 
+# Theme static files every flavor references, relative to ``_static``.
+_BASE_STATIC_ASSETS: tuple[str, ...] = (
+    "custom.css",
+    "fonts.css",
+    "fonts/open-sans/*",
+    "images/banner-violet.jpg",
+    "code_word_breaks.js",
+    "renameVersionLinks.js",
+    "rdcMisc.js",
+    "theme_mode_captions.js",
+    "search.js",
+)
+
+# Theme static files used by the shared header and footer sections.
+_HEADER_FOOTER_STATIC_ASSETS: tuple[str, ...] = (
+    "rocm_header.css",
+    "rocm_footer.css",
+    "images/amd-header-logo.svg",
+)
+
+# Manifest of the theme static files each flavor needs. Flavors that are not
+# listed render the shared header and footer and use the default manifest.
+_FLAVOR_STATIC_ASSETS: dict[str, tuple[str, ...]] = {
+    "rocm-ft": _BASE_STATIC_ASSETS,
+}
+_DEFAULT_STATIC_ASSETS = _BASE_STATIC_ASSETS + _HEADER_FOOTER_STATIC_ASSETS
+
+# Stylesheets of the theme, in the order they are linked from each page.
+_THEME_CSS_FILES: tuple[str, ...] = (
+    "custom.css",
+    "rocm_header.css",
+    "rocm_footer.css",
+    "fonts.css",
+)
+
+_THEME_STATIC_DIR = Path(__file__).parent / "rocm_docs_theme" / "static"
+
+
+def _flavor_static_assets(flavor: str) -> tuple[str, ...]:
+    """Return the manifest of theme static files needed by *flavor*."""
+    return _FLAVOR_STATIC_ASSETS.get(flavor, _DEFAULT_STATIC_ASSETS)
+
+
+def _in_manifest(asset: str, manifest: tuple[str, ...]) -> bool:
+    return any(fnmatch(asset, pattern) for pattern in manifest)
+
+
+# Theme scripts with their loading method, in the order they are linked.
+_THEME_JS_FILES: tuple[tuple[str, str], ...] = (
+    ("code_word_breaks.js", "async"),
+    ("renameVersionLinks.js", "async"),
+    ("rdcMisc.js", "async"),
+    ("theme_mode_captions.js", "async"),
+    ("search.js", "defer"),
+)
+
+# Theme static files that are only needed to build the theme itself.
+_THEME_SOURCE_FILES: tuple[str, ...] = ("*.scss", "*.map")
+
+
+@functools.cache
+def _static_digest() -> str:
+    """Return a short hash of the names and contents of the theme files."""
+    digest = hashlib.sha256()
+    for path in sorted(_THEME_STATIC_DIR.rglob("*")):
+        if path.is_file():
+            digest.update(
+                path.relative_to(_THEME_STATIC_DIR).as_posix().encode()
+            )
+            digest.update(b"\0")
+            digest.update(output.file_digest(path).encode())
+    return digest.hexdigest()[:12]
+
+
+def _static_version() -> str:
+    """Return the version the shared theme static files are published under.
+
+    This is the version of rocm-docs-core, or, when it is used without
+    package metadata (e.g. from a source checkout), a hash of the files.
+    """
+    try:
+        return importlib.metadata.version("rocm-docs-core")
+    except importlib.metadata.PackageNotFoundError:
+        return _static_digest()
+
+
+def _shared_static_url(app: Sphinx) -> str:
+    """Return the URL the theme static files are shared from, or ``""``.
+
+    ``{version}`` in the ``shared_static_url`` theme option is replaced by the
+    version of rocm-docs-core, so each release is served from its own path,
+    see :func:`_static_version`.
+    """
+    url: str = get_theme_options_dict(app).get("shared_static_url") or ""
+    if not url:
+        return ""
+    url = url.format(version=_static_version())
+    return url if url.endswith("/") else url + "/"
+
+
+def _theme_asset_url(app: Sphinx, asset: str) -> str:
+    """Return the name to register *asset* under with Sphinx."""
+    return _shared_static_url(app) + asset
+
+
+def _add_theme_assets(app: Sphinx) -> None:
+    """Link the theme stylesheets that the active flavor needs and the scripts.
+
+    With the ``shared_static_url`` theme option set, the files are linked from
+    that URL instead of each project's ``_static`` folder.
+    """
+    flavor = get_theme_options_dict(app).get("flavor", "rocm")
+    manifest = _flavor_static_assets(flavor)
+    for css in _THEME_CSS_FILES:
+        if _in_manifest(css, manifest):
+            app.add_css_file(_theme_asset_url(app, css))
+    for js, loading_method in _THEME_JS_FILES:
+        app.add_js_file(
+            _theme_asset_url(app, js), loading_method=loading_method
+        )
+
+
+def _add_theme_static_context(
+    app: Sphinx,
+    pagename: str,  # noqa: ARG001
+    templatename: str,  # noqa: ARG001
+    context: dict[str, Any],
+    doctree: object,  # noqa: ARG001
+) -> None:
+    """Provide ``theme_static(asset)`` to link theme static files in templates."""
+    shared_url = _shared_static_url(app)
+    pathto = context["pathto"]
+
+    def theme_static(asset: str) -> str:
+        if shared_url:
+            return shared_url + asset
+        return str(pathto(f"_static/{asset}", 1))
+
+    context["theme_static"] = theme_static
+
+
+def _emit_shared_static(app: Sphinx, exception: Exception | None) -> None:
+    """Copy the theme static files to the ``shared_static_dir`` theme option.
+
+    The directory holds the files served from ``shared_static_url`` and may be
+    shared by the builds of several projects, so files that are already
+    present with identical content are left untouched. The files are cloned
+    or hard linked rather than copied where possible.
+    """
+    if exception is not None or getattr(app.builder, "format", "") != "html":
+        return
+    shared_dir: str = get_theme_options_dict(app).get("shared_static_dir") or ""
+    if not shared_dir or not _shared_static_url(app):
+        return
+    target_dir = Path(app.confdir, shared_dir.format(version=_static_version()))
+    # Declared by rocm_docs.core, which may not be loaded with the theme.
+    hardlink = bool(getattr(app.config, "rocm_docs_hardlink_files", False))
+    copied = 0
+    for path in sorted(_THEME_STATIC_DIR.rglob("*")):
+        asset = path.relative_to(_THEME_STATIC_DIR).as_posix()
+        if not path.is_file() or _in_manifest(asset, _THEME_SOURCE_FILES):
+            continue
+        target = target_dir / asset
+        if output.place_file(path, target, hardlink=hardlink) != "unchanged":
+            copied += 1
+    if copied:
+        logger.info(
+            "Copied %d shared theme static files to %s", copied, target_dir
+        )
+
+
+def _prune_static_assets(app: Sphinx, exception: Exception | None) -> None:
+    """Remove theme static files the active flavor and the pages do not need.
+
+    Sphinx copies the whole theme ``static`` directory into every project's
+    ``_static``. With the ``prune_static_assets`` theme option enabled, files
+    that are neither in the flavor's manifest nor referenced from an output
+    page are removed again after the build, so they are not deployed.
+    Files shadowed by the project's own ``html_static_path`` are kept.
+
+    When the theme static files are linked from ``shared_static_url``, no
+    theme static file is needed in ``_static`` unless a page references it.
+    """
+    if exception is not None or getattr(app.builder, "format", "") != "html":
+        return
+    theme_opts = get_theme_options_dict(app)
+    shared = bool(_shared_static_url(app))
+    if not theme_opts.get("prune_static_assets", False) and not shared:
+        return
+
+    manifest = (
+        ()
+        if shared
+        else _flavor_static_assets(theme_opts.get("flavor", "rocm"))
+    )
+    static_out = Path(app.outdir, "_static")
+    project_static = [Path(app.confdir, p) for p in app.config.html_static_path]
+    candidates = []
+    for path in sorted(_THEME_STATIC_DIR.rglob("*")):
+        if not path.is_file():
+            continue
+        asset = path.relative_to(_THEME_STATIC_DIR).as_posix()
+        if _in_manifest(asset, manifest):
+            continue
+        if any(Path(root, asset).exists() for root in project_static):
+            continue
+        if static_out.joinpath(asset).is_file():
+            candidates.append(asset)
+    if not candidates:
+        return
+
+    for page in Path(app.outdir).rglob("*.html"):
+        html = page.read_text(encoding="utf-8", errors="replace")
+        candidates = [c for c in candidates if f"_static/{c}" not in html]
+        if not candidates:
+            return
+
+    pruned_bytes = 0
+    for asset in candidates:
+        target = static_out / asset
+        pruned_bytes += target.stat().st_size
+        target.unlink()
+        # Drop directories that only held pruned files.
+        parent = target.parent
+        while parent != static_out and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+    logger.info(
+        "Pruned %d theme static files (%d KiB) not needed by flavor %r",
+        len(candidates),
+        pruned_bytes // 1024,
+        theme_opts.get("flavor", "rocm"),
+    )
+
+
 def setup(app: Sphinx) -> dict[str, Any]:
     """Set up the module as a Sphinx extension."""
     app.add_js_file(
@@ -303,25 +542,17 @@ def setup(app: Sphinx) -> dict[str, Any]:
         priority=999_999,
         loading_method="async",
     )
-    app.add_js_file("code_word_breaks.js", loading_method="async")
-    app.add_js_file("renameVersionLinks.js", loading_method="async")
-    app.add_js_file("rdcMisc.js", loading_method="async")
-    app.add_js_file("theme_mode_captions.js", loading_method="async")
-    app.add_js_file("search.js", loading_method="defer")
     here = Path(__file__).parent.resolve()
     theme_path = here / "rocm_docs_theme"
     app.add_html_theme("rocm_docs_theme", str(theme_path))
-    for css in [
-        "custom.css",
-        "rocm_header.css",
-        "rocm_footer.css",
-        "fonts.css",
-    ]:
-        app.add_css_file(css)
 
     app.connect("html-page-context", _add_custom_context)
+    app.connect("html-page-context", _add_theme_static_context)
     app.connect("builder-inited", _update_theme_options)
+    app.connect("builder-inited", _add_theme_assets)
     app.connect("builder-inited", _load_flavor_assets)
+    app.connect("build-finished", _emit_shared_static)
+    app.connect("build-finished", _prune_static_assets)
 
     # Add theme option declarations
     app.add_config_value("header_title", "", "html")
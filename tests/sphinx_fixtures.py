@@ -33,12 +33,17 @@ SITES_BASEFOLDER = Path(__file__).parent / "sites"
 
 
 def build_sphinx(
-    srcdir: Path, outdir: Path, confdir: Path | None = None
+    srcdir: Path,
+    outdir: Path,
+    confdir: Path | None = None,
+    parallel: int = 0,
+    buildername: str = "html",
 ) -> None:
     confdir = confdir or srcdir
     doctreedir = outdir / ".doctrees"
-    buildername = "html"
-    app = Sphinx(srcdir, confdir, outdir, doctreedir, buildername)
+    app = Sphinx(
+        srcdir, confdir, outdir, doctreedir, buildername, parallel=parallel
+    )
     app.build()
 
 
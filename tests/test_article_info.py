@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import importlib.resources
+import shutil
+import unittest.mock
+from pathlib import Path
+
+import pytest
+from docutils import frontend, nodes
+from docutils.utils import new_document
+from git.repo import Repo
+from sphinx.application import Sphinx
+from sphinx.environment import BuildEnvironment
+
+from rocm_docs import article_info
+
+from .sphinx_fixtures import SITES_BASEFOLDER, build_sphinx
+
+_TEMPLATE = (
+    importlib.resources.files("rocm_docs")
+    .joinpath("rocm_docs_theme/components/article-info.html")
+    .read_text(encoding="utf-8")
+)
+
+
+def test_render_article_info() -> None:
+    html = article_info._render_article_info(
+        _TEMPLATE,
+        os_info="Applies to Linux",
+        author="AMD",
+        date_info="",
+        read_time="3 min read time",
+    )
+
+    assert "Applies to Linux" in html
+    assert "AMD" in html
+    assert "3 min read time" in html
+    # An empty date removes the calendar icon but keeps the clock icon.
+    assert "article-info-date-svg" not in html
+    assert "sd-octicon-calendar" not in html
+    assert "article-info-read-time-svg" in html
+
+
+def test_read_time_collector() -> None:
+    doctree = new_document("page", frontend.get_default_settings())
+    section = nodes.section()
+    section += nodes.title(text="Two words")
+    section += nodes.paragraph(text=" ".join(["word"] * 597))
+    section += nodes.comment(text="not counted")
+    section += nodes.raw(text="<p>not counted</p>", format="html")
+    doctree += section
+    env = unittest.mock.NonCallableMock(spec=BuildEnvironment)
+    env.docname = "page"
+    app = unittest.mock.NonCallableMock(spec=Sphinx)
+    app.env = env
+    collector = article_info.ReadTimeCollector()
+
+    collector.process_doc(app, doctree)
+
+    assert article_info._word_counts(env) == {"page": 599}
+    assert article_info._estimate_read_time(env, "page") == "3 min read time"
+    collector.clear_doc(app, env, "page")
+    assert article_info._estimate_read_time(env, "page") == "1 min read time"
+
+
+def test_insert_article_info() -> None:
+    body = (
+        '<section><h1>Title<a class="headerlink">#</a></h1><p>x</p></section>'
+    )
+
+    html = article_info._insert_article_info(body, "<div>INFO</div>")
+
+    assert html == (
+        '<section><h1>Title<a class="headerlink">#</a></h1>'
+        "<div>INFO</div><p>x</p></section>"
+    )
+    assert article_info._insert_article_info("<p>x</p>", "INFO") is None
+    existing = '<h1>T</h1>\n<div id="rocm-docs-core-article-info">'
+    assert article_info._insert_article_info(existing, "INFO") is None
+
+
+def _make_app(tmp_path: Path, **config: Any) -> unittest.mock.NonCallableMock:
+    app = unittest.mock.NonCallableMock()
+    app.srcdir = str(tmp_path)
+    app.project.doc2path.side_effect = lambda docname, _: f"{docname}.md"
+    app.env = SimpleNamespace(rocm_docs_word_counts={"index": 600})
+    app.config.setting_all_article_info = False
+    app.config.article_pages = []
+    app.config.all_article_info_os = ["linux"]
+    app.config.all_article_info_author = ""
+    app.config.all_article_info_date = "2020-01-01"
+    for key, value in config.items():
+        setattr(app.config, key, value)
+    return app
+
+
+def test_html_page_context(tmp_path: Path) -> None:
+    app = _make_app(
+        tmp_path,
+        setting_all_article_info=True,
+        article_pages=[{"file": "other", "author": "Author: AMD"}],
+    )
+    renderer = article_info._ArticleInfoRenderer()
+    renderer.pages = {"other": app.config.article_pages[0]}
+    renderer.dates = {"other": "2024-05-06"}
+    doctree = new_document("index", frontend.get_default_settings())
+
+    contexts = {}
+    for docname in ("index", "other"):
+        contexts[docname] = {"body": "<h1>Title</h1><p>Text</p>"}
+        renderer.html_page_context(
+            app, docname, "page.html", contexts[docname], doctree
+        )
+
+    index = contexts["index"]["body"]
+    assert index.startswith("<h1>Title</h1><div id=")
+    assert "3 min read time" in index
+    assert "2020-01-01" in index
+    assert "Applies to Linux" in index
+    other = contexts["other"]["body"]
+    assert "Author: AMD" in other
+    assert "2024-05-06" in other
+    assert "1 min read time" in other
+
+
+def test_html_page_context_disabled(tmp_path: Path) -> None:
+    app = _make_app(tmp_path)
+    renderer = article_info._ArticleInfoRenderer()
+    doctree = new_document("index", frontend.get_default_settings())
+    context = {"body": "<h1>Title</h1>"}
+
+    renderer.html_page_context(app, "index", "page.html", context, doctree)
+
+    assert context == {"body": "<h1>Title</h1>"}
+
+
+def test_env_get_outdated(tmp_path: Path) -> None:
+    app = _make_app(tmp_path, setting_all_article_info=True)
+    env = unittest.mock.NonCallableMock(spec=BuildEnvironment)
+    env.all_docs = {"a": 0, "b": 0, "c": 0, "d": 0}
+    renderer = article_info._ArticleInfoRenderer()
+
+    dates = {"a": "2024-01-01", "b": "2024-01-01", "c": "2024-01-01"}
+    with unittest.mock.patch.object(
+        renderer, "_lookup_dates", return_value=dates
+    ):
+        # Nothing is known about the previous build.
+        assert renderer.env_get_outdated(app, env, set(), set(), set()) == []
+
+    dates = {"a": "2024-01-01", "b": "2024-02-01", "d": "2024-02-01"}
+    with unittest.mock.patch.object(
+        renderer, "_lookup_dates", return_value=dates
+    ):
+        outdated = renderer.env_get_outdated(app, env, set(), {"d"}, set())
+
+    # "d" is read again anyway because its source changed.
+    assert outdated == ["b", "c"]
+    assert env.rocm_docs_article_info_dates == dates
+
+
+@pytest.mark.parametrize("buildername", ["html", "dirhtml"])
+def test_article_info_in_built_pages(tmp_path: Path, buildername: str) -> None:
+    srcdir = tmp_path / "site"
+    outdir = tmp_path / buildername
+    shutil.copytree(SITES_BASEFOLDER / "llms", srcdir)
+    with (srcdir / "conf.py").open("a", encoding="utf-8") as conf:
+        conf.write("rocm_docs_generate_llms = False\n")
+        conf.write("setting_all_article_info = True\n")
+    files = [str(path) for path in srcdir.rglob("*") if path.is_file()]
+    repo = Repo.init(srcdir)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    repo.index.add(files)
+    stamp = "2024-05-06T12:00:00"
+    repo.index.commit("Add site", author_date=stamp, commit_date=stamp)
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("ROCM_DOCS_REMOTE_DETAILS", ",")
+        monkeypatch.setattr("sphinx.util.logging.setup", unittest.mock.Mock())
+        build_sphinx(srcdir, outdir, buildername=buildername)
+
+    page = (
+        "page_rst/index.html" if buildername == "dirhtml" else "page_rst.html"
+    )
+    html = (outdir / page).read_text(encoding="utf-8")
+    # The header follows the first title of the article, not of the theme.
+    _, article = html.split('<article class="bd-article"', 1)
+    _, after_title = article.split("</h1>", 1)
+    assert after_title.lstrip().startswith(
+        '<div id="rocm-docs-core-article-info"'
+    )
+    assert html.count('id="rocm-docs-core-article-info"') == 1
+    assert "2024-05-06" in html
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from rocm_docs import deploy
+
+
+def test_diff_manifests_cli(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    def entry(digest: str) -> dict[str, object]:
+        return {"size": 1, "sha256": digest, "stage": "sphinx"}
+
+    old = tmp_path / "old.json"
+    new = tmp_path / "new.json"
+    old.write_text(
+        json.dumps(
+            {
+                "version": 1,
+                "files": {"a": entry("1"), "b": entry("2"), "c": entry("3")},
+            }
+        ),
+        encoding="utf-8",
+    )
+    new.write_text(
+        json.dumps(
+            {
+                "version": 1,
+                "files": {"a": entry("1"), "b": entry("4"), "d": entry("5")},
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    assert deploy.main([str(old), str(new)]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "upload b",
+        "upload d",
+        "delete c",
+    ]
+
+    upload = tmp_path / "upload.txt"
+    delete = tmp_path / "delete.txt"
+    deploy.main(
+        [
+            str(tmp_path / "missing.json"),
+            str(new),
+            f"--upload={upload}",
+            f"--delete={delete}",
+        ]
+    )
+    assert upload.read_text(encoding="utf-8") == "a\nb\nd\n"
+    assert delete.read_text(encoding="utf-8") == ""
+
+
+def test_missing_new_manifest_is_an_error(tmp_path: Path) -> None:
+    old = tmp_path / "old.json"
+    old.write_text(
+        json.dumps({"version": 1, "files": {"a": {"size": 1, "sha256": "1"}}}),
+        encoding="utf-8",
+    )
+
+    def run() -> None:
+        deploy.main([str(old), str(tmp_path / "missing.json")])
+
+    with pytest.raises(SystemExit) as exit_info:
+        run()
+    assert exit_info.value.code == 2
+
+
+def test_malformed_manifest_entry_is_an_error(tmp_path: Path) -> None:
+    old = tmp_path / "old.json"
+    old.write_text(
+        json.dumps({"version": 1, "files": {"a": {"size": 1}}}),
+        encoding="utf-8",
+    )
+    new = tmp_path / "new.json"
+    new.write_text(
+        json.dumps({"version": 1, "files": {"a": {"size": 1, "sha256": "1"}}}),
+        encoding="utf-8",
+    )
+
+    with pytest.raises(SystemExit) as exit_info:
+        deploy.main([str(old), str(new)])
+    assert exit_info.value.code == 2
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import unittest.mock
+from pathlib import Path
+
+import pytest
+from git.repo import Repo
+
+from rocm_docs import git_index
+
+
+def _commit(repo: Repo, date: str, **files: str) -> None:
+    for name, content in files.items():
+        path = Path(str(repo.working_tree_dir), name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+        repo.index.add([name])
+    stamp = f"{date}T12:00:00"
+    repo.index.commit(f"Update {date}", author_date=stamp, commit_date=stamp)
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Repo:
+    repo = Repo.init(tmp_path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    _commit(repo, "2023-01-01", **{"docs/a.md": "a", "docs/b.md": "b"})
+    _commit(repo, "2023-02-01", **{"docs/a.md": "a2", "README.md": "r"})
+    _commit(repo, "2023-03-01", **{"docs/sub/c.md": "c"})
+    return repo
+
+
+def test_last_modified_dates(repo: Repo, tmp_path: Path) -> None:
+    docs = tmp_path / "docs"
+    (docs / "new.md").write_text("uncommitted", encoding="utf-8")
+
+    dates = git_index.last_modified_dates(
+        repo,
+        [
+            docs / "a.md",
+            docs / "b.md",
+            docs / "sub" / "c.md",
+            docs / "new.md",
+            tmp_path.parent / "outside.md",
+        ],
+    )
+
+    assert dates == {
+        docs / "a.md": "2023-02-01",
+        docs / "b.md": "2023-01-01",
+        docs / "sub" / "c.md": "2023-03-01",
+    }
+
+
+def test_last_modified_dates_relative_paths(
+    repo: Repo, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+
+    dates = git_index.last_modified_dates(repo, ["README.md"])
+
+    assert dates == {Path("README.md"): "2023-02-01"}
+
+
+def test_last_modified_dates_cache(repo: Repo, tmp_path: Path) -> None:
+    docs = tmp_path / "docs"
+    cache = tmp_path / "cache" / git_index.CACHE_FILENAME
+    paths = [docs / "a.md", docs / "b.md", docs / "new.md"]
+    assert git_index.last_modified_dates(repo, paths, cache) == {
+        docs / "a.md": "2023-02-01",
+        docs / "b.md": "2023-01-01",
+    }
+
+    _commit(repo, "2023-04-01", **{"docs/b.md": "b2", "docs/new.md": "n"})
+    with unittest.mock.patch.object(
+        git_index, "_iter_log", wraps=git_index._iter_log
+    ) as iter_log:
+        dates = git_index.last_modified_dates(repo, paths, cache)
+
+    assert dates == {
+        docs / "a.md": "2023-02-01",
+        docs / "b.md": "2023-04-01",
+        docs / "new.md": "2023-04-01",
+    }
+    # Only the new commit was read; no history walk was needed.
+    assert iter_log.call_count == 1
+    assert iter_log.call_args.args[1].endswith(f"..{repo.head.commit.hexsha}")
+
+
+def test_last_modified_dates_cache_rewritten_history(
+    repo: Repo, tmp_path: Path
+) -> None:
+    cache = tmp_path / git_index.CACHE_FILENAME
+    path = tmp_path / "docs" / "a.md"
+    git_index.last_modified_dates(repo, [path], cache)
+
+    repo.git.reset("--hard", "HEAD~2")
+
+    assert git_index.last_modified_dates(repo, [path], cache) == {
+        path: "2023-01-01"
+    }
+
+
+def test_last_modified_dates_cache_merged_older_commit(
+    repo: Repo, tmp_path: Path
+) -> None:
+    cache = tmp_path / git_index.CACHE_FILENAME
+    path = tmp_path / "docs" / "a.md"
+    _commit(repo, "2023-05-01", **{"docs/a.md": "a3"})
+    main = repo.active_branch
+    assert git_index.last_modified_dates(repo, [path], cache) == {
+        path: "2023-05-01"
+    }
+
+    # A side branch with an older commit to the same file is merged in.
+    side = repo.create_head("side", "HEAD~1")
+    side.checkout()
+    _commit(repo, "2023-04-01", **{"docs/a.md": "side"})
+    main.checkout()
+    repo.git.merge("-s", "ours", "--no-edit", "side")
+
+    assert git_index.last_modified_dates(repo, [path], cache) == {
+        path: "2023-05-01"
+    }
+    assert git_index.last_modified_dates(repo, [path]) == {path: "2023-05-01"}
@@ -8,6 +8,7 @@ the full doctree -> Markdown pipeline rather than mocking it.
 from __future__ import annotations
 
 import dataclasses
+import importlib.metadata
 import logging
 import shutil
 import unittest.mock
@@ -251,6 +252,135 @@ def test_no_meta_warning(llms_build: _LlmsBuild) -> None:
     assert not any("<meta" in msg for msg in llms_build.warnings)
 
 
+def test_parallel_build_matches_serial(
+    llms_build: _LlmsBuild, tmp_path: Path
+) -> None:
+    """Pages rendered in worker processes are assembled in TOC order."""
+    srcdir = tmp_path / "llms"
+    outdir = tmp_path / "llms_build"
+    shutil.copytree(SITES_BASEFOLDER / "llms", srcdir)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("ROCM_DOCS_REMOTE_DETAILS", ",")
+        monkeypatch.setattr("sphinx.util.logging.setup", unittest.mock.Mock())
+        build_sphinx(srcdir, outdir, parallel=2)
+
+    assert (outdir / "llms.txt").read_text(encoding="utf-8") == llms_build.index
+    assert (outdir / "llms-full.txt").read_text(
+        encoding="utf-8"
+    ) == llms_build.full
+
+
+def test_unchanged_pages_reuse_cached_markdown(
+    llms_build: _LlmsBuild, tmp_path: Path
+) -> None:
+    """A rebuild without changes renders no page again."""
+    from rocm_docs import llms
+
+    srcdir = tmp_path / "llms"
+    outdir = tmp_path / "llms_build"
+    shutil.copytree(SITES_BASEFOLDER / "llms", srcdir)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("ROCM_DOCS_REMOTE_DETAILS", ",")
+        monkeypatch.setattr("sphinx.util.logging.setup", unittest.mock.Mock())
+        build_sphinx(srcdir, outdir)
+        (outdir / "llms-full.txt").unlink()
+        monkeypatch.setattr(
+            llms,
+            "_render_page_markdown",
+            unittest.mock.Mock(side_effect=AssertionError("rendered")),
+        )
+        build_sphinx(srcdir, outdir)
+
+    assert (outdir / "llms-full.txt").read_text(
+        encoding="utf-8"
+    ) == llms_build.full
+
+
+def test_full_text_split_into_shards(
+    llms_build: _LlmsBuild, tmp_path: Path
+) -> None:
+    """Shards hold the pages of llms-full.txt and are listed in a manifest."""
+    srcdir = tmp_path / "llms"
+    outdir = tmp_path / "llms_build"
+    shutil.copytree(SITES_BASEFOLDER / "llms", srcdir)
+    with (srcdir / "conf.py").open("a", encoding="utf-8") as conf:
+        conf.write("rocm_docs_llms_full_shard_size = 600\n")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("ROCM_DOCS_REMOTE_DETAILS", ",")
+        monkeypatch.setattr("sphinx.util.logging.setup", unittest.mock.Mock())
+        build_sphinx(srcdir, outdir)
+
+    index = (outdir / "llms.txt").read_text(encoding="utf-8")
+    assert f"({BASE_URL}/llms-full-manifest.txt)" in index
+    manifest = (outdir / "llms-full-manifest.txt").read_text(encoding="utf-8")
+    shards = sorted(outdir.glob("llms-full-[0-9][0-9][0-9].txt"))
+    assert len(shards) > 1
+    full = (outdir / "llms-full.txt").read_text(encoding="utf-8")
+    for shard in shards:
+        assert f"[{shard.name}]({BASE_URL}/{shard.name})" in manifest
+        text = shard.read_text(encoding="utf-8")
+        body = text.split("\n", 1)[1]
+        assert body.rstrip() in full
+    # The index and the pages of the full text are not affected.
+    assert full.startswith(index.rstrip())
+    assert full.endswith(llms_build.full[len(llms_build.index.rstrip()) :])
+
+    # Disabling the option removes the shards of the previous build.
+    conf_text = (srcdir / "conf.py").read_text(encoding="utf-8")
+    (srcdir / "conf.py").write_text(
+        conf_text.replace("= 600", "= 0"), encoding="utf-8"
+    )
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("ROCM_DOCS_REMOTE_DETAILS", ",")
+        monkeypatch.setattr("sphinx.util.logging.setup", unittest.mock.Mock())
+        build_sphinx(srcdir, outdir)
+    assert not list(outdir.glob("llms-full-*.txt"))
+
+
+def test_token_budget_moves_largest_pages_to_index(
+    llms_build: _LlmsBuild, tmp_path: Path
+) -> None:
+    """Pages over the token budget are listed in the index only."""
+    import json
+
+    srcdir = tmp_path / "llms"
+    outdir = tmp_path / "llms_build"
+    shutil.copytree(SITES_BASEFOLDER / "llms", srcdir)
+    with (srcdir / "conf.py").open("a", encoding="utf-8") as conf:
+        conf.write(
+            "def count_words(text):\n"
+            "    return len(text.split())\n"
+            "rocm_docs_llms_tokenizer = count_words\n"
+            "rocm_docs_llms_token_budget = 150\n"
+        )
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("ROCM_DOCS_REMOTE_DETAILS", ",")
+        monkeypatch.setattr("sphinx.util.logging.setup", unittest.mock.Mock())
+        build_sphinx(srcdir, outdir)
+
+    report = json.loads(
+        (outdir / ".doctrees" / "llms-tokens.json").read_text(encoding="utf-8")
+    )
+    assert report["tokenizer"] == "count_words"
+    pages = report["pages"]
+    assert [page["tokens"] for page in pages] == sorted(
+        (page["tokens"] for page in pages), reverse=True
+    )
+    assert pages[0]["index_only"]
+    assert report["totals"]["full"] <= 150
+    assert report["totals"]["index_only"] == sum(
+        page["tokens"] for page in pages if page["index_only"]
+    )
+
+    full = (outdir / "llms-full.txt").read_text(encoding="utf-8")
+    index = (outdir / "llms.txt").read_text(encoding="utf-8")
+    assert index == llms_build.index
+    url = f"{BASE_URL}/{pages[0]['page']}.html"
+    assert url in index
+    assert f"Source: {url}" not in full
+    assert f"Source: {BASE_URL}/{pages[-1]['page']}.html" in full
+
+
 def test_no_files_written_on_build_failure(tmp_path: Path) -> None:
     """generate_llms_full is a no-op when the build raised an exception."""
     import unittest.mock
@@ -342,3 +472,129 @@ def test_walk_sitemap_dedupes_across_suffix_spellings() -> None:
     # "index" (root) and "page" each appear exactly once; the "index.md"
     # self-reference is de-duplicated rather than recursing forever.
     assert docnames == ["index", "page"]
+
+
+def test_strip_unsupported_nodes_in_place() -> None:
+    """Nodes are normalized without a copy, even without parent links."""
+    from docutils import nodes
+    from docutils.utils import new_document
+    from sphinx_design.tabs import sd_tab_input
+
+    from rocm_docs.llms import _strip_unsupported_nodes
+
+    doctree = new_document("page")
+    section = nodes.section()
+    doctree += section
+    inner = nodes.tip("", nodes.paragraph(text="inner"))
+    section += nodes.caution("", nodes.paragraph(text="outer"), inner)
+    container = nodes.container()
+    section += container
+    # Like sphinx-design, add a child without setting its parent.
+    container.children.append(sd_tab_input())
+    section += nodes.raw("", "<p>dropped</p>", format="html")
+
+    _strip_unsupported_nodes(doctree)
+
+    assert doctree[0] is section
+    assert [type(node) for node in section] == [nodes.note, nodes.container]
+    note = section[0]
+    assert isinstance(note, nodes.Element)
+    assert isinstance(note[1], nodes.note)
+    assert note[1][0].astext() == "inner"
+    assert note[1].parent is note
+    assert not container.children
+
+
+def test_registered_node_replacement_applies_in_same_pass(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A registered type is replaced, and the closest registered base wins."""
+    from docutils import nodes
+    from docutils.utils import new_document
+
+    from rocm_docs import llms
+
+    monkeypatch.setattr(
+        llms, "_NODE_REPLACEMENTS", dict(llms._NODE_REPLACEMENTS)
+    )
+    monkeypatch.setattr(llms, "_DISPATCH", {})
+    llms.register_node_replacement(
+        nodes.tip, lambda tip: [nodes.paragraph(text=f"Tip: {tip.astext()}")]
+    )
+    llms.register_node_replacement(nodes.line_block, lambda _: [])
+
+    doctree = new_document("page")
+    doctree += nodes.tip("", nodes.paragraph(text="one"))
+    doctree += nodes.caution("", nodes.line_block("", nodes.line(text="x")))
+
+    llms._strip_unsupported_nodes(doctree)
+
+    assert [type(node) for node in doctree] == [nodes.paragraph, nodes.note]
+    assert doctree[0].astext() == "Tip: one"
+    assert not doctree[1].children
+
+
+def test_split_shards_along_toc_sections() -> None:
+    """Sections stay together unless they do not fit in a shard."""
+    from rocm_docs.llms import _split_shards, _TocEntry
+
+    def entry(docname: str, depth: int) -> _TocEntry:
+        return _TocEntry(docname=docname, url=None, title=None, depth=depth)
+
+    entries = [
+        entry("index", 0),
+        entry("a", 1),
+        entry("a/1", 2),
+        entry("a/2", 2),
+        entry("b", 1),
+        entry("b/1", 2),
+        entry("b/1/x", 3),
+        entry("b/2", 2),
+        _TocEntry(docname=None, url="https://x", title="X", depth=1),
+        entry("c", 1),
+    ]
+    sizes = {
+        "index": 10,
+        "a": 10,
+        "a/1": 20,
+        "a/2": 20,
+        "b": 10,
+        "b/1": 30,
+        "b/1/x": 30,
+        "b/2": 200,
+        "c": 10,
+    }
+
+    shards = _split_shards(entries, sizes, 100)
+
+    assert [[e.docname for e in shard] for shard in shards] == [
+        ["index", "a", "a/1", "a/2"],
+        ["b", "b/1", "b/1/x"],
+        ["b/2", None],
+        ["c"],
+    ]
+
+
+def test_shard_paths_match_any_number_of_digits(tmp_path: Path) -> None:
+    from rocm_docs.llms import SHARD_FILENAME, _shard_paths
+
+    names = [SHARD_FILENAME.format(index=index) for index in (1, 999, 1000)]
+    for name in [*names, "llms-full.txt", "llms-full-manifest.txt"]:
+        (tmp_path / name).touch()
+
+    assert sorted(path.name for path in _shard_paths(tmp_path)) == sorted(names)
+
+
+def test_cache_without_package_metadata(tmp_path: Path) -> None:
+    """The render cache works when rocm-docs-core has no dist metadata."""
+    from rocm_docs import llms, output
+
+    app = unittest.mock.NonCallableMock()
+    app.doctreedir = str(tmp_path)
+    with unittest.mock.patch(
+        "importlib.metadata.version",
+        side_effect=importlib.metadata.PackageNotFoundError("rocm-docs-core"),
+    ):
+        cache = llms._MarkdownCache(app)
+
+    assert output.file_digest(Path(llms.__file__)) in cache.salt
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("latex2mathml")
+
+from rocm_docs import mathml
+
+
+def test_convert_inline() -> None:
+    result = mathml._convert("a^2", "inline")
+    assert result is not None
+    assert result.startswith("<math")
+    assert 'display="inline"' in result
+
+
+def test_convert_unknown_command_is_left_to_mathjax() -> None:
+    assert mathml._convert(r"\unknowncmd{x}", "inline") is None
+    assert mathml._convert(r"\frac{a}{", "inline") is None
+
+
+def test_cache_persists_conversions(tmp_path: Path) -> None:
+    path = tmp_path / mathml.CACHE_FILENAME
+    cache = mathml._MathMLCache(path)
+    converted = cache.convert("x + 1", "block")
+    assert converted is not None
+    assert cache.convert(r"\unknowncmd", "inline") is None
+    cache.save()
+
+    reloaded = mathml._MathMLCache(path)
+    assert not reloaded.dirty
+    assert reloaded.convert("x + 1", "block") == converted
+    assert reloaded.convert(r"\unknowncmd", "inline") is None
+    # Both hits were served from the persisted cache.
+    assert not reloaded.dirty
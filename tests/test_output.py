@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+import unittest.mock
+from pathlib import Path
+
+import pytest
+from sphinx.application import Sphinx
+
+from rocm_docs import output
+
+from .sphinx_fixtures import SITES_BASEFOLDER, build_sphinx
+
+
+def test_write_if_changed(tmp_path: Path) -> None:
+    path = tmp_path / "llms.txt"
+
+    assert output.write_if_changed(path, "text")
+    os.utime(path, ns=(0, 0))
+    assert not output.write_if_changed(path, b"text")
+    assert path.stat().st_mtime_ns == 0
+    assert output.write_if_changed(path, "other")
+    assert path.read_text(encoding="utf-8") == "other"
+
+
+def test_hash_outputs_restores_mtimes(tmp_path: Path) -> None:
+    outdir = tmp_path / "html"
+    hashes = tmp_path / "doctrees" / "hashes.json"
+    (outdir / "_static").mkdir(parents=True)
+    same = outdir / "index.html"
+    changed = outdir / "_static" / "theme.css"
+    same.write_text("page", encoding="utf-8")
+    changed.write_text("body {}", encoding="utf-8")
+    os.utime(same, ns=(0, 1_000_000_000))
+    os.utime(changed, ns=(0, 1_000_000_000))
+
+    assert output.hash_outputs(outdir, hashes, restore_mtimes=True)[1] == 0
+
+    # The next build rewrites both files, only one with new content.
+    same.write_text("page", encoding="utf-8")
+    changed.write_text("body { margin: 0 }", encoding="utf-8")
+    (outdir / "new.html").write_text("new", encoding="utf-8")
+
+    assert output.hash_outputs(outdir, hashes, restore_mtimes=True)[1] == 1
+    assert same.stat().st_mtime_ns == 1_000_000_000
+    assert changed.stat().st_mtime_ns != 1_000_000_000
+
+    # Files that were not written again are not hashed again.
+    with unittest.mock.patch.object(output, "file_digest") as digest:
+        records, restored = output.hash_outputs(outdir, hashes)
+    assert restored == 0
+    assert sorted(records) == ["_static/theme.css", "index.html", "new.html"]
+    digest.assert_not_called()
+
+
+def test_hash_outputs_keeps_pages_newer_than_sources(tmp_path: Path) -> None:
+    outdir = tmp_path / "html"
+    hashes = tmp_path / "doctrees" / "hashes.json"
+    outdir.mkdir()
+    page = outdir / "index.html"
+    page.write_text("page", encoding="utf-8")
+    os.utime(page, ns=(0, 1_000_000_000))
+    output.hash_outputs(outdir, hashes, restore_mtimes=True)
+
+    page.write_text("page", encoding="utf-8")
+    min_mtimes = {"index.html": 2_000_000_000}
+
+    assert output.hash_outputs(
+        outdir, hashes, restore_mtimes=True, min_mtimes=min_mtimes
+    ) == ({"index.html": [unittest.mock.ANY, 4, 2_000_000_000]}, 1)
+    assert page.stat().st_mtime_ns == 2_000_000_000
+
+
+def test_hash_outputs_leaves_hard_links_alone(tmp_path: Path) -> None:
+    outdir = tmp_path / "html"
+    hashes = tmp_path / "doctrees" / "hashes.json"
+    outdir.mkdir()
+    tagfile = outdir / "tagfile.xml"
+    tagfile.write_text("tags", encoding="utf-8")
+    os.utime(tagfile, ns=(0, 1_000_000_000))
+    output.hash_outputs(outdir, hashes, restore_mtimes=True)
+
+    # The next build places the file as a hard link to its source.
+    source = tmp_path / "doxygen" / "tagfile.xml"
+    source.parent.mkdir()
+    source.write_text("tags", encoding="utf-8")
+    source_mtime = source.stat().st_mtime_ns
+    tagfile.unlink()
+    os.link(source, tagfile)
+
+    assert output.hash_outputs(outdir, hashes, restore_mtimes=True)[1] == 0
+    assert source.stat().st_mtime_ns == source_mtime
+
+
+def test_touched_source_is_not_rebuilt_again(tmp_path: Path) -> None:
+    """A page restored after its source was touched is up to date."""
+    srcdir = tmp_path / "site"
+    outdir = tmp_path / "html"
+    shutil.copytree(SITES_BASEFOLDER / "llms", srcdir)
+    with (srcdir / "conf.py").open("a", encoding="utf-8") as conf:
+        conf.write("rocm_docs_skip_unchanged_writes = True\n")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("ROCM_DOCS_REMOTE_DETAILS", ",")
+        monkeypatch.setattr("sphinx.util.logging.setup", unittest.mock.Mock())
+        build_sphinx(srcdir, outdir)
+        source = srcdir / "page_rst.rst"
+        touched = time.time_ns()
+        os.utime(source, ns=(touched, touched))
+        app = Sphinx(srcdir, srcdir, outdir, outdir / ".doctrees", "html")
+        app.build()
+
+    assert list(app.builder.get_outdated_docs()) == []
+    assert (outdir / "page_rst.html").stat().st_mtime_ns == touched
+
+
+def test_finish_outputs_disabled(tmp_path: Path) -> None:
+    app = unittest.mock.NonCallableMock()
+    app.config.rocm_docs_skip_unchanged_writes = False
+    app.config.rocm_docs_deploy_manifest = False
+    app.doctreedir = str(tmp_path)
+
+    output.finish_outputs(app, None)
+
+    assert not list(tmp_path.iterdir())
+
+
+def test_hash_outputs_skips_doctrees(tmp_path: Path) -> None:
+    doctrees = tmp_path / ".doctrees"
+    doctrees.mkdir()
+    (doctrees / "index.doctree").write_bytes(b"doctree")
+    (tmp_path / "index.html").write_text("page", encoding="utf-8")
+    hashes = doctrees / "hashes.json"
+
+    output.hash_outputs(tmp_path, hashes)
+
+    assert list(json.loads(hashes.read_text(encoding="utf-8"))) == [
+        "index.html"
+    ]
+
+
+def test_deploy_manifest(tmp_path: Path) -> None:
+    app = unittest.mock.NonCallableMock()
+    app.config.rocm_docs_skip_unchanged_writes = False
+    app.config.rocm_docs_deploy_manifest = True
+    app.builder.name = "html"
+    app.outdir = str(tmp_path / "html")
+    app.doctreedir = str(tmp_path / "doctrees")
+    for name in ("index.html", "llms.txt", "doxygen/html/a.html"):
+        path = tmp_path / "html" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name, encoding="utf-8")
+    output.register_stage(app, "llms", lambda _: ["llms.txt"])
+    output.register_stage(app, "doxygen", lambda _: ["doxygen/html/"])
+
+    output.finish_outputs(app, None)
+    # The manifest of a previous build does not list itself.
+    output.finish_outputs(app, None)
+
+    manifest = json.loads(
+        (tmp_path / "html" / output.MANIFEST_FILENAME).read_text("utf-8")
+    )
+    assert manifest["version"] == output.MANIFEST_VERSION
+    assert manifest["files"] == {
+        "doxygen/html/a.html": {
+            "size": 19,
+            "sha256": output.file_digest(
+                tmp_path / "html" / "doxygen/html/a.html"
+            ),
+            "stage": "doxygen",
+        },
+        "index.html": unittest.mock.ANY,
+        "llms.txt": unittest.mock.ANY,
+    }
+    assert manifest["files"]["index.html"]["stage"] == "sphinx"
+    assert manifest["files"]["llms.txt"]["stage"] == "llms"
+
+
+def test_place_file(tmp_path: Path) -> None:
+    src = tmp_path / "src.css"
+    dst = tmp_path / "out" / "dst.css"
+    src.write_text("body {}", encoding="utf-8")
+
+    with unittest.mock.patch.object(output, "_reflink", return_value=False):
+        assert output.place_file(src, dst) == "copy"
+        assert not dst.samefile(src)
+        assert output.place_file(src, dst) == "unchanged"
+
+        dst.unlink()
+        assert output.place_file(src, dst, hardlink=True) == "hardlink"
+        assert dst.samefile(src)
+        assert output.place_file(src, dst, hardlink=True) == "unchanged"
+
+        # A changed file replaces the link instead of writing through it.
+        other = tmp_path / "other.css"
+        other.write_text("p {}", encoding="utf-8")
+        assert output.place_file(other, dst) == "copy"
+    assert dst.read_text(encoding="utf-8") == "p {}"
+    assert src.read_text(encoding="utf-8") == "body {}"
+
+
+def test_place_tree(tmp_path: Path) -> None:
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    (src / "a.html").write_text("a", encoding="utf-8")
+    (src / "sub" / "b.css").write_text("b", encoding="utf-8")
+    dst = tmp_path / "dst"
+    dst.mkdir()
+    (dst / "a.html").write_text("a", encoding="utf-8")
+    (dst / "kept.txt").write_text("kept", encoding="utf-8")
+
+    methods = output.place_tree(src, dst)
+
+    assert methods["unchanged"] == 1
+    assert sum(methods.values()) == 2
+    assert (dst / "sub" / "b.css").read_text(encoding="utf-8") == "b"
+    assert (dst / "kept.txt").exists()
+
+
+def test_replace_if_changed(tmp_path: Path) -> None:
+    path = tmp_path / "llms-full.txt"
+    with output.replace_if_changed(path) as file:
+        file.write("a\n")
+        file.write("b\n")
+    assert path.read_text(encoding="utf-8") == "a\nb\n"
+    os.utime(path, ns=(0, 0))
+
+    with output.replace_if_changed(path) as file:
+        file.write("a\nb\n")
+    assert path.stat().st_mtime_ns == 0
+
+    def fail() -> None:
+        with output.replace_if_changed(path) as file:
+            file.write("partial")
+            raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        fail()
+    assert path.read_text(encoding="utf-8") == "a\nb\n"
+    assert sorted(tmp_path.iterdir()) == [path]
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+import logging
+import unittest.mock
+from pathlib import Path
+
+import pytest
+
+from rocm_docs import page_weight, postprocess
+
+_PAGE = """<html><head>
+<link rel="stylesheet" href="../_static/theme.css">
+<link rel="canonical" href="https://example.com/guide/page.html">
+<script src="../_static/app.js"></script>
+<script>var x = 1;</script>
+</head><body>
+<div class="bd-sidebar-primary"><div><a href="../index.html">Home</a></div></div>
+<article><svg><g><path d="M0"/></g></svg>
+<img src="../_static/logo.png"><img src="https://cdn.example.com/x.png">
+</article></body></html>
+"""
+
+
+def _site(tmp_path: Path) -> tuple[Path, Path]:
+    static = tmp_path / "_static"
+    static.mkdir(parents=True)
+    (static / "theme.css").write_bytes(b"a" * 100)
+    (static / "app.js").write_bytes(b"b" * 20)
+    (static / "logo.png").write_bytes(b"c" * 3)
+    (static / "webpack-macros.html").write_text("<p></p>")
+    page = tmp_path / "guide" / "page.html"
+    page.parent.mkdir()
+    page.write_text(_PAGE, encoding="utf-8")
+    return tmp_path, page
+
+
+def test_measure_page(tmp_path: Path) -> None:
+    outdir, page = _site(tmp_path)
+
+    weight = page_weight.measure_page(outdir, page, _PAGE, {})
+
+    assert weight.page == "guide/page.html"
+    assert weight.html == len(_PAGE)
+    svg = '<svg><g><path d="M0"/></g></svg>'
+    assert weight.inline == len(svg) + len("var x = 1;")
+    sidebar_start = _PAGE.index('<div class="bd-sidebar-primary">')
+    sidebar_end = _PAGE.index("</div></div>") + len("</div></div>")
+    assert weight.sidebar == sidebar_end - sidebar_start
+    # Only local resources count; links to pages and remote files do not.
+    assert weight.assets == 123
+    assert weight.total == weight.html + 123
+
+
+def test_page_weight_transform(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    outdir, _ = _site(tmp_path / "html")
+    app = unittest.mock.NonCallableMock()
+    app.builder.format = "html"
+    app.outdir = str(outdir)
+    app.parallel = 1
+    app.doctreedir = str(tmp_path / "doctrees")
+    app.config.rocm_docs_page_weight_report = True
+    app.config.rocm_docs_page_weight_top_n = 5
+    app.config.rocm_docs_page_weight_budgets = {
+        "rocm-ft": {"html": 1},
+        page_weight.DEFAULT_BUDGET_KEY: {"html": 10, "assets": 1000},
+    }
+
+    with (
+        unittest.mock.patch.object(
+            page_weight, "get_theme_options_dict", return_value={}
+        ),
+        caplog.at_level(logging.INFO),
+    ):
+        processor = postprocess.PostProcessor()
+        processor.transforms.append(page_weight.page_weight_transform())
+        processor.build_finished(app, None)
+
+    report = json.loads(
+        (tmp_path / "doctrees" / page_weight.REPORT_FILENAME).read_text()
+    )
+    assert report["flavor"] == "rocm"
+    assert [entry["page"] for entry in report["pages"]] == ["guide/page.html"]
+    assert report["totals"]["assets"] == 123
+    # The default budget applies because the rocm flavor has none of its own.
+    assert "guide/page.html exceeds the page weight budget" in caplog.text
+    assert f"html {len(_PAGE)} > 10" in caplog.text
+    assert "assets 123 >" not in caplog.text
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import logging
+import unittest.mock
+from pathlib import Path
+
+import pytest
+
+from rocm_docs import postprocess
+
+
+def _add_class(page: postprocess.Page) -> None:
+    body = page.tree.body
+    assert body is not None
+    body["class"] = "processed"
+    page.tree_changed()
+
+
+def _count_processed(page: postprocess.Page) -> tuple[str, bool]:
+    # Sees the change made to the tree by the previous transform.
+    return page.name, 'class="processed"' in page.html
+
+
+@pytest.mark.parametrize("parallel", [1, 2])
+def test_post_processor(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture, parallel: int
+) -> None:
+    for name in ("b.html", "a.html", "sub/c.html", "_static/skip.html"):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("<html><body><p>x</p></body></html>")
+    (tmp_path / "bad.html").write_bytes(b"\xff\xfe")
+    app = unittest.mock.NonCallableMock()
+    app.builder.format = "html"
+    app.outdir = str(tmp_path)
+    app.parallel = parallel
+    finished = unittest.mock.Mock()
+    processor = postprocess.PostProcessor()
+    processor.transforms += [
+        postprocess.Transform("add_class", _add_class),
+        postprocess.Transform("count", _count_processed, finish=finished),
+        postprocess.Transform("disabled", _add_class, enabled=lambda _: False),
+    ]
+
+    with caplog.at_level(logging.INFO):
+        processor.build_finished(app, None)
+
+    finished.assert_called_once_with(
+        app, [("a.html", True), ("b.html", True), ("sub/c.html", True)]
+    )
+    assert 'class="processed"' in (tmp_path / "sub/c.html").read_text()
+    assert "processed" not in (tmp_path / "_static/skip.html").read_text()
+    assert "Failed to post-process bad.html" in caplog.text
+    assert "Post-processed 4 pages: read" in caplog.text
+    assert "add_class" in caplog.text
+    assert "disabled" not in caplog.text
+
+
+def test_page_html_setter(tmp_path: Path) -> None:
+    path = tmp_path / "page.html"
+    path.write_text("<p>x</p>")
+    page = postprocess.Page(tmp_path, path)
+
+    page.html = "<p>x</p>"
+    changed_by_same_html = page.changed
+    page.html = "<p>y</p>"
+
+    assert not changed_by_same_html
+    assert page.changed
+    paragraph = page.tree.p
+    assert paragraph is not None
+    assert paragraph.string == "y"
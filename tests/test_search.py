@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import Any
+
+import gzip
+import json
+import unittest.mock
+from pathlib import Path
+
+from rocm_docs import search
+
+
+def _frozen_index() -> dict[str, Any]:
+    return {
+        "docnames": ("api", "index"),
+        "titles": ("API", "Home"),
+        "terms": {"hipmalloc": 0, "kernel": [0, 1], "x": 1},
+        "titleterms": {"home": 1},
+        "objects": {
+            "hip": [(0, 0, 1, "", "hipMalloc")],
+            # Sphinx does not split C++ names at "::".
+            "": [(0, 0, 1, "_CPPv4N7rocblas7gemm_exEv", "rocblas::gemm_ex")],
+        },
+        "objnames": {0: ("cpp", "function", "C++ function")},
+    }
+
+
+def test_shard_index_groups_terms_by_prefix() -> None:
+    shards = search._shard_index(_frozen_index())
+
+    assert shards["hi"]["terms"] == {"hipmalloc": 0}
+    assert shards["ke"]["terms"] == {"kernel": [0, 1]}
+    # Terms shorter than the prefix length get a shard of their own.
+    assert shards["x"]["terms"] == {"x": 1}
+    assert shards["ho"]["titleterms"] == {"home": 1}
+    # Objects are sharded by their lowercased short name with the anchor
+    # expanded to the full name.
+    assert shards["hi"]["objects"] == [
+        [0, 0, 1, "hip.hipMalloc", "hip.hipMalloc"]
+    ]
+    # C++ objects are sharded by the name after the last "::", where the
+    # client looks for both the short and the qualified name.
+    assert shards["ge"]["objects"] == [
+        [0, 0, 1, "_CPPv4N7rocblas7gemm_exEv", "rocblas::gemm_ex"]
+    ]
+    assert "ro" not in shards
+    for query in ("gemm_ex", "rocblas::gemm_ex"):
+        assert search.object_shard_key(query) == "ge"
+
+
+def test_shard_filename_is_path_safe() -> None:
+    assert search.shard_filename("a/") == "shard-612f.json.gz"
+
+
+def test_write_search_index(tmp_path: Path) -> None:
+    app = unittest.mock.NonCallableMock()
+    app.config.rocm_docs_search_index = True
+    app.builder.format = "html"
+    app.builder.indexer.freeze.return_value = _frozen_index()
+    app.builder.get_target_uri.side_effect = lambda docname: f"{docname}.html"
+    app.outdir = str(tmp_path)
+    stale = tmp_path / search.INDEX_DIRNAME / search.shard_filename("zz")
+    stale.parent.mkdir()
+    stale.touch()
+
+    search.write_search_index(app, None)
+
+    index_dir = tmp_path / search.INDEX_DIRNAME
+    manifest = json.loads(
+        gzip.decompress((index_dir / search.MANIFEST_FILENAME).read_bytes())
+    )
+    assert manifest["docurls"] == ["api.html", "index.html"]
+    assert manifest["shards"] == ["ge", "hi", "ho", "ke", "x"]
+    for key in manifest["shards"]:
+        assert (index_dir / search.shard_filename(key)).is_file()
+    assert not stale.exists()
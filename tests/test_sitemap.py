@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import unittest.mock
+from pathlib import Path
+
+import pytest
+from git.repo import Repo
+
+from rocm_docs import sitemap
+
+
+def test_render_sitemaps_shards(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(sitemap, "MAX_URLS", 2)
+    urls = [
+        ("https://x/a.html", "2023-01-01"),
+        ("https://x/b.html?q=1&r=2", None),
+        ("https://x/c.html", "2023-03-01"),
+    ]
+
+    files = sitemap.render_sitemaps(urls, "https://x/")
+
+    assert sorted(files) == ["sitemap-1.xml", "sitemap-2.xml", "sitemap.xml"]
+    assert "<sitemapindex " in files["sitemap.xml"]
+    assert "<loc>https://x/sitemap-2.xml</loc>" in files["sitemap.xml"]
+    assert (
+        "<url><loc>https://x/a.html</loc><lastmod>2023-01-01</lastmod></url>"
+        in files["sitemap-1.xml"]
+    )
+    assert (
+        "<url><loc>https://x/b.html?q=1&amp;r=2</loc></url>"
+        in files["sitemap-1.xml"]
+    )
+    assert "https://x/c.html" in files["sitemap-2.xml"]
+
+
+def test_write_sitemap(tmp_path: Path) -> None:
+    repo = Repo.init(tmp_path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    srcdir = tmp_path / "docs"
+    srcdir.mkdir()
+    (srcdir / "index.md").write_text("index", encoding="utf-8")
+    repo.index.add(["docs/index.md"])
+    stamp = "2023-05-01T12:00:00"
+    repo.index.commit("Add", author_date=stamp, commit_date=stamp)
+    (srcdir / "new.md").write_text("new", encoding="utf-8")
+    outdir = tmp_path / "html"
+    outdir.mkdir()
+    (outdir / "sitemap-3.xml").touch()
+
+    app = unittest.mock.NonCallableMock()
+    app.config.rocm_docs_sitemap = True
+    app.config.html_baseurl = "https://example.com/docs"
+    app.builder.format = "html"
+    app.builder.get_target_uri.side_effect = lambda docname: f"{docname}.html"
+    app.env.found_docs = {"index", "new"}
+    app.project.doc2path.side_effect = lambda docname, _: f"{docname}.md"
+    app.srcdir = str(srcdir)
+    app.outdir = str(outdir)
+    app.doctreedir = str(tmp_path / "doctrees")
+
+    sitemap.write_sitemap(app, None)
+
+    content = (outdir / sitemap.SITEMAP_FILENAME).read_text(encoding="utf-8")
+    assert content.splitlines()[2:] == [
+        "<url><loc>https://example.com/docs/index.html</loc>"
+        "<lastmod>2023-05-01</lastmod></url>",
+        "<url><loc>https://example.com/docs/new.html</loc></url>",
+        "</urlset>",
+    ]
+    assert not (outdir / "sitemap-3.xml").exists()
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import importlib.metadata
+import shutil
+import unittest.mock
+from pathlib import Path
+
+import pytest
+
+import rocm_docs.theme
+
+
+def _make_app(
+    outdir: Path, confdir: Path, **theme_options: object
+) -> unittest.mock.NonCallableMock:
+    app = unittest.mock.NonCallableMock()
+    app.builder = SimpleNamespace(format="html", theme_options=theme_options)
+    app.outdir = str(outdir)
+    app.confdir = str(confdir)
+    app.config.html_static_path = []
+    return app
+
+
+@pytest.fixture
+def built_static(tmp_path: Path) -> Path:
+    outdir = tmp_path / "html"
+    shutil.copytree(rocm_docs.theme._THEME_STATIC_DIR, outdir / "_static")
+    outdir.joinpath("index.html").write_text(
+        '<img src="_static/images/rocm-logo.png"/>', encoding="utf-8"
+    )
+    return outdir
+
+
+def test_prune_static_assets(built_static: Path, tmp_path: Path) -> None:
+    app = _make_app(
+        built_static, tmp_path, flavor="rocm-ft", prune_static_assets=True
+    )
+    rocm_docs.theme._prune_static_assets(app, None)
+
+    static = built_static / "_static"
+    # Header/footer assets are not in the rocm-ft manifest...
+    assert not static.joinpath("rocm_header.css").exists()
+    assert not static.joinpath("images/amd-header-logo.svg").exists()
+    assert not static.joinpath("fonts.scss").exists()
+    # ...but assets of the manifest and those referenced by a page are kept.
+    assert static.joinpath("custom.css").is_file()
+    assert static.joinpath("images/banner-violet.jpg").is_file()
+    assert static.joinpath("images/rocm-logo.png").is_file()
+
+
+def test_prune_static_assets_disabled(
+    built_static: Path, tmp_path: Path
+) -> None:
+    app = _make_app(built_static, tmp_path, flavor="rocm-ft")
+    rocm_docs.theme._prune_static_assets(app, None)
+
+    assert built_static.joinpath("_static/rocm_header.css").is_file()
+
+
+def test_shared_static_url(tmp_path: Path) -> None:
+    app = _make_app(
+        tmp_path,
+        tmp_path,
+        shared_static_url="/_theme/rocm-docs-core/{version}",
+        shared_static_dir="shared/{version}",
+    )
+    with unittest.mock.patch(
+        "importlib.metadata.version", return_value="1.2.3"
+    ):
+        rocm_docs.theme._add_theme_assets(app)
+        rocm_docs.theme._emit_shared_static(app, None)
+
+    app.add_css_file.assert_any_call("/_theme/rocm-docs-core/1.2.3/custom.css")
+    app.add_js_file.assert_any_call(
+        "/_theme/rocm-docs-core/1.2.3/search.js", loading_method="defer"
+    )
+    shared = tmp_path / "shared" / "1.2.3"
+    assert shared.joinpath("custom.css").is_file()
+    assert shared.joinpath("images/amd-header-logo.svg").is_file()
+    assert not shared.joinpath("fonts.scss").exists()
+
+
+def test_shared_static_url_without_package_metadata(tmp_path: Path) -> None:
+    app = _make_app(
+        tmp_path,
+        tmp_path,
+        shared_static_url="/_theme/rocm-docs-core/{version}",
+        shared_static_dir="shared/{version}",
+    )
+    with unittest.mock.patch(
+        "importlib.metadata.version",
+        side_effect=importlib.metadata.PackageNotFoundError("rocm-docs-core"),
+    ):
+        rocm_docs.theme._add_theme_assets(app)
+        rocm_docs.theme._emit_shared_static(app, None)
+
+    digest = rocm_docs.theme._static_digest()
+    app.add_css_file.assert_any_call(
+        f"/_theme/rocm-docs-core/{digest}/custom.css"
+    )
+    assert tmp_path.joinpath("shared", digest, "custom.css").is_file()
+
+
+def test_prune_static_assets_shared(built_static: Path, tmp_path: Path) -> None:
+    app = _make_app(
+        built_static, tmp_path, shared_static_url="/_theme/rocm-docs-core/"
+    )
+    rocm_docs.theme._prune_static_assets(app, None)
+
+    static = built_static / "_static"
+    # The pages link the theme files from the shared URL instead.
+    assert not static.joinpath("custom.css").exists()
+    assert static.joinpath("images/rocm-logo.png").is_file()